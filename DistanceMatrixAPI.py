@@ -1,13 +1,23 @@
-import os
 import csv
 import itertools
-import pandas as pd
-from tqdm import tqdm
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING
 
-import requests
-import json
-from buzzbot_constants import buzzbotConfiguration
+from instrumentation import run_report
+from location_index import find_venues, normalise_location_name
 from models import Fixture
+from travel_time_cache import TravelTimeCache, open_travel_time_cache
+
+# pandas, requests and tqdm are slow to import, so they are only imported by the code paths that use them.
+if TYPE_CHECKING:
+    import pandas as pd
+    import requests
+
+DEFAULT_ENDPOINT = "https://api.distancematrix.ai/maps/api/distancematrix/json?"
+EARTH_RADIUS_KM = 6371.0
 
 
 class DistanceMatrixLocation:
@@ -23,33 +33,170 @@ class DistanceMatrixLocation:
         return f"{self.lat},{self.long}"
 
 
+def haversine_km(origin: (float, float), destination: (float, float)) -> float:
+    """
+    Great-circle distance between two lat long pairs
+    :param origin: Tuple of floats representing the lat long of the origin
+    :param destination: Tuple of floats representing the lat long of the destination
+    :return: Distance in kilometres
+    """
+    lat1, long1 = map(math.radians, origin)
+    lat2, long2 = map(math.radians, destination)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((long2 - long1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+class TravelTimeBounds:
+    """
+    Lower and upper bounds on the driving time between two locations, derived from the great-circle distance between
+    them. No drive can beat the straight line at motorway speed, and no drive is assumed to be longer than the
+    straight line times a detour factor at a slow urban speed, plus a fixed overhead for parking and walking.
+    """
+
+    def __init__(
+        self,
+        max_speed_kmh: float = 120.0,
+        detour_factor: float = 2.5,
+        min_speed_kmh: float = 25.0,
+        overhead_minutes: float = 10.0,
+    ):
+        self.max_speed_kmh: float = max_speed_kmh
+        self.detour_factor: float = detour_factor
+        self.min_speed_kmh: float = min_speed_kmh
+        self.overhead_minutes: float = overhead_minutes
+
+    def lower_seconds(self, distance_km: float) -> int:
+        return int(distance_km / self.max_speed_kmh * 3600)
+
+    def upper_seconds(self, distance_km: float) -> float:
+        return (
+            distance_km * self.detour_factor / self.min_speed_kmh * 3600
+            + self.overhead_minutes * 60
+        )
+
+    def decides(self, distance_km: float, gaps: [float]) -> bool:
+        """
+        Checks whether the exact travel time between two locations can change any eligibility decision. A team playing
+        at one location can cover a game at the other if and only if the travel time is no longer than the gap between
+        the two games, so the exact value is only needed when some gap falls between the two bounds.
+
+        :param distance_km: Great-circle distance between the two locations
+        :param gaps: Minutes between the end of a game at one location and the start of a game at the other, for
+        every pair of games played at the two locations on the same day (negative if they overlap)
+        :return: True if every gap is decided by the bounds alone
+        """
+        lower_minutes = self.lower_seconds(distance_km) // 60
+        upper_minutes = self.upper_seconds(distance_km) / 60
+        return all(gap < lower_minutes or gap >= upper_minutes for gap in gaps)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls out so that no more than a set number happen per second.
+    """
+
+    def __init__(self, requests_per_second: float):
+        self.interval: float = 1 / requests_per_second if requests_per_second else 0
+        self.next_slot: float = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class DistanceMatrixInterface:
-    def __init__(self, API_KEY_: str):
+    def __init__(
+        self,
+        API_KEY_: str,
+        batch_requests_: bool = True,
+        max_origins_: int = 25,
+        max_destinations_: int = 25,
+        max_elements_: int = 100,
+        endpoint_: str = DEFAULT_ENDPOINT,
+        max_workers_: int = 4,
+        requests_per_second_: float = 5,
+        max_retries_: int = 3,
+        backoff_seconds_: float = 0.5,
+        timeout_seconds_: float = 10,
+        cache_backend_: str = "json",
+        cache_file_: str = None,
+        prefilter_: TravelTimeBounds = None,
+    ):
+        """
+        :param API_KEY_: distancematrix.ai API key
+        :param batch_requests_: If true, uncached location pairs are packed into as few many-to-many requests as the
+        provider limits allow. If false, one request is made per location pair.
+        :param max_origins_: Maximum number of origins the provider accepts in a single request
+        :param max_destinations_: Maximum number of destinations the provider accepts in a single request
+        :param max_elements_: Maximum number of origin-destination elements the provider accepts in a single request
+        :param endpoint_: URL of the distance matrix endpoint, ending in '?'
+        :param max_workers_: Number of requests that can be in flight at once
+        :param requests_per_second_: Cap on the number of requests started per second, 0 for no cap
+        :param max_retries_: Number of times a failed request is retried
+        :param backoff_seconds_: Wait before the first retry, doubled on every retry after that
+        :param timeout_seconds_: Timeout for a single request
+        :param cache_backend_: Travel time cache backend, one of 'json', 'log', 'sqlite' or 'memory'
+        :param cache_file_: Location of the cache file, defaults to a file per backend in the working directory
+        :param prefilter_: Travel time bounds used to skip pairs whose exact travel time can't change any decision,
+        None to fetch every pair
+        """
         self.API_KEY: str = API_KEY_
-        self.endpoint: str = (
-            "https://api.distancematrix.ai/maps/api/distancematrix/json?"
-        )
+        self.endpoint: str = endpoint_
         self.locations: [DistanceMatrixLocation] = []
         self.request_url: str = ""
         self.json_response: dict = {}
         self.number_of_requests = 0
-        self.cache_file: str = "distance_matrix_cache.json"
-        self.cache: dict = self.load_cache()
+        self.batch_requests: bool = batch_requests_
+        self.max_origins: int = max_origins_
+        self.max_destinations: int = max_destinations_
+        self.max_elements: int = max_elements_
+        self.max_workers: int = max(1, max_workers_)
+        self.rate_limiter: RateLimiter = RateLimiter(requests_per_second_)
+        self.max_retries: int = max_retries_
+        self.backoff_seconds: float = backoff_seconds_
+        self.timeout_seconds: float = timeout_seconds_
+        self.session: "requests.Session" = self.create_session()
+        self.request_count_lock = threading.Lock()
+        self.cache_backend: str = cache_backend_
+        self.cache_file: str = cache_file_
+        self.cache: TravelTimeCache = self.load_cache()
+        self.prefilter: TravelTimeBounds = prefilter_
+        self.number_of_prefiltered_pairs = 0
 
-    def load_cache(self) -> dict:
-        if os.path.exists(self.cache_file):
-            with open(self.cache_file, "r") as f:
-                return json.load(f)
-        else:
-            return {}
+    def create_session(self) -> "requests.Session":
+        """
+        Creates the HTTP session shared by every request, with a connection pool big enough for every worker.
+        """
+        import requests
+        import requests.adapters
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.max_workers, pool_maxsize=self.max_workers
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def load_cache(self) -> TravelTimeCache:
+        return open_travel_time_cache(self.cache_backend, self.cache_file)
 
     def save_cache(self) -> None:
-        with open(self.cache_file, "w") as f:
-            json.dump(self.cache, f)
+        self.cache.commit()
 
     def add_to_cache(self, key: str, time: int) -> None:
-        self.cache[key] = time
-        self.save_cache()
+        """
+        Buffers a travel time in the cache. Nothing is written to disk until save_cache is called.
+        """
+        self.cache.add(key, time)
 
     def get_cache_size(self) -> int:
         return len(self.cache)
@@ -60,74 +207,302 @@ class DistanceMatrixInterface:
             for location_id, location_data in location_manager_dict.items()
         ]
 
-    def build_distance_matrix_request(self, origin, destination):
-        origins_str: str = origin.to_request_format()
-        destinations_str: str = destination.to_request_format()
-        url: str = f"{self.endpoint}origins={origins_str}&destinations={destinations_str}&key={self.API_KEY}"
+    def build_distance_matrix_request(self, origins, destinations) -> str:
+        """
+        Builds the request URL for the travel times from every origin to every destination.
+
+        :param origins: A DistanceMatrixLocation or a list of them
+        :param destinations: A DistanceMatrixLocation or a list of them
+        :return: The request URL
+        """
+        if isinstance(origins, DistanceMatrixLocation):
+            origins = [origins]
+        if isinstance(destinations, DistanceMatrixLocation):
+            destinations = [destinations]
+        origins_str: str = "|".join(o.to_request_format() for o in origins)
+        destinations_str: str = "|".join(d.to_request_format() for d in destinations)
+        url: str = (
+            f"{self.endpoint}origins={origins_str}&destinations={destinations_str}&key={self.API_KEY}"
+        )
         self.request_url = url
+        return url
 
-    def make_request(self):
-        try:
-            response = requests.get(self.request_url)
-            self.number_of_requests += 1
-            if response.status_code == 200:
-                self.json_response = response.json()
-            else:
+    def make_request(self, url: str = None):
+        """
+        Makes a request to the API, retrying with exponential backoff on connection errors, rate limiting (429), server
+        errors (5xx) and responses that aren't JSON.
+
+        :param url: The request URL, defaults to the last URL built
+        :return: The JSON response as a dictionary, or None if the request failed
+        """
+        import requests
+
+        url = url or self.request_url
+        self.json_response = {}
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+            self.rate_limiter.wait()
+            with self.request_count_lock:
+                self.number_of_requests += 1
+            run_report.increment("api.requests")
+            if attempt:
+                run_report.increment("api.retries")
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=self.timeout_seconds)
+            except requests.RequestException as e:
+                run_report.increment("api.errors")
                 print(
-                    f"[-] ERROR: fetching data issue when an API request has been made; status code {response.status_code}"
+                    f"[-] ERROR: an error when making a request to {url} has occurred (attempt {attempt + 1}). The following exception message has been thrown: {e}"
                 )
-                return None
-        except Exception as e:
+                continue
+            run_report.observe("api.latency_ms", (time.perf_counter() - start) * 1000)
+            if response.status_code == 200:
+                try:
+                    self.json_response = response.json()
+                    return self.json_response
+                except ValueError as e:
+                    # e.g. a proxy or captive portal page served in place of the API, retried like a server error
+                    run_report.increment("api.errors")
+                    print(
+                        f"[-] ERROR: the response from {url} is not valid JSON (attempt {attempt + 1}): {e}"
+                    )
+                    continue
+            run_report.increment("api.errors")
             print(
-                f"[-] ERROR: an error when making a request to {self.request_url} has occurred. The following exception message has been thrown: {e}"
+                f"[-] ERROR: fetching data issue when an API request has been made; status code {response.status_code}"
             )
-            return None
+            if response.status_code != 429 and response.status_code < 500:
+                run_report.increment("api.failed_requests")
+                return None
+        run_report.increment("api.failed_requests")
+        return None
+
+    def parse_response(self, json_response: dict = None) -> [[int]]:
+        """
+        Parses the full rows x elements matrix of a response.
 
-    def parse_response(self):
+        :param json_response: The response to parse, defaults to the last response received
+        :return: List with a row per origin, each holding the travel time in seconds to every destination (None for
+        elements the provider could not route). None if the response could not be parsed at all.
+        """
+        if json_response is None:
+            json_response = self.json_response
         try:
-            row = self.json_response["rows"][0]
-            element = row["elements"][0]
-            travel_time = element["duration"]["value"]
-            return travel_time
-        except (IndexError, KeyError):
+            travel_times = []
+            for row in json_response["rows"]:
+                travel_times.append(
+                    [
+                        element["duration"]["value"] if "duration" in element else None
+                        for element in row["elements"]
+                    ]
+                )
+            if not travel_times:
+                raise IndexError
+            return travel_times
+        except (IndexError, KeyError, TypeError):
             print("[-] ERROR: Unable to parse response correctly.")
             return None
 
-    def get_travel_time_table(self) -> dict:
+    def plan_batched_requests(self, pairs: list) -> list:
+        """
+        Packs location pairs into as few many-to-many requests as the provider limits allow. The origin-destination
+        matrix is tiled into blocks of at most max_origins x max_destinations locations (and max_elements elements),
+        and one request is planned for every block that contains at least one of the given pairs.
+
+        :param pairs: List of (origin, destination) DistanceMatrixLocation tuples, in the order they appear in
+        self.locations
+        :return: List of (origins, destinations) tuples, each a list of DistanceMatrixLocation objects
+        """
+        block_origins = max(1, min(self.max_origins, math.isqrt(self.max_elements)))
+        block_destinations = max(
+            1, min(self.max_destinations, self.max_elements // block_origins)
+        )
+        index = {id(location): i for i, location in enumerate(self.locations)}
+
+        blocks = {}
+        for origin, destination in pairs:
+            i, j = index[id(origin)], index[id(destination)]
+            block = blocks.setdefault(
+                (i // block_origins, j // block_destinations), (set(), set())
+            )
+            block[0].add(i)
+            block[1].add(j)
+
+        return [
+            (
+                [self.locations[i] for i in sorted(origins)],
+                [self.locations[j] for j in sorted(destinations)],
+            )
+            for origins, destinations in blocks.values()
+        ]
+
+    def request_travel_times(self, origins: list, destinations: list) -> [[int]]:
+        """
+        Requests the travel times from every origin to every destination. Safe to call from several threads at once.
+
+        :param origins: List of DistanceMatrixLocation objects
+        :param destinations: List of DistanceMatrixLocation objects
+        :return: The parsed rows x elements matrix, or None if the request failed
+        """
+        print(
+            f"[*] Handling request for {len(origins)} origin(s) and {len(destinations)} destination(s)"
+        )
+        url = self.build_distance_matrix_request(origins, destinations)
+        json_response = self.make_request(url)
+        if json_response is None:
+            return None
+        return self.parse_response(json_response)
+
+    def fetch_travel_times(self, pairs: list) -> dict:
+        """
+        Requests the travel times for the given location pairs from the API, with up to max_workers requests in
+        flight at once. Pairs whose request failed are left out of the result.
+
+        :param pairs: List of (origin, destination) DistanceMatrixLocation tuples
+        :return: Dictionary of "origin_destination" keys and travel times in seconds
+        """
+        if self.batch_requests:
+            plans = self.plan_batched_requests(pairs)
+        else:
+            plans = [([origin], [destination]) for origin, destination in pairs]
+
+        wanted = {
+            (origin.to_request_format(), destination.to_request_format())
+            for origin, destination in pairs
+        }
+        travel_times = {}
+        with run_report.span("fetch"), ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor:
+            futures = {
+                executor.submit(self.request_travel_times, origins, destinations): (
+                    origins,
+                    destinations,
+                )
+                for origins, destinations in plans
+            }
+            for future in as_completed(futures):
+                origins, destinations = futures[future]
+                matrix = future.result()
+                if matrix is None:
+                    continue
+                for i, origin in enumerate(origins):
+                    for j, destination in enumerate(destinations):
+                        pair = (
+                            origin.to_request_format(),
+                            destination.to_request_format(),
+                        )
+                        try:
+                            travel_time = matrix[i][j]
+                        except IndexError:
+                            continue
+                        if pair in wanted and travel_time is not None:
+                            travel_times["_".join(pair)] = travel_time
+        return travel_times
+
+    def get_travel_time_table(
+        self, decision_gaps: dict = None, pairs: list = None
+    ) -> dict:
+        """
+        Builds the table of travel times in seconds between every pair of locations, from the cache where possible and
+        from the API otherwise.
+
+        If a prefilter is set and decision_gaps is given, uncached pairs whose exact travel time can't change any
+        eligibility decision are not fetched. Their lower bound travel time is put in the table instead, which leads to
+        exactly the same decisions, and is never cached.
+
+        :param decision_gaps: Dictionary where key is a sorted tuple of two location names, and the values are the
+        gaps in minutes between every pair of games played at the two locations on the same day. Pairs that are
+        missing are never played at on the same day.
+        :param pairs: List of (origin, destination) DistanceMatrixLocation tuples to build the table for, defaults to
+        every pair of locations
+        :return: Dictionary of "origin_destination" keys and travel times in seconds
+        """
+        from tqdm import tqdm
+
         print(("~" * 20) + " Initialising travel time table " + ("~" * 20))
         travel_times = {}
-        for origin, destination in tqdm(itertools.combinations(self.locations, 2)):
+        uncached_pairs = []
+        cached_pairs = 0
+        prefiltered = 0
+        if pairs is None:
+            pairs = itertools.combinations(self.locations, 2)
+        for origin, destination in tqdm(pairs):
             key = f"{origin.to_request_format()}_{destination.to_request_format()}"
             reverse_key = (
                 f"{destination.to_request_format()}_{origin.to_request_format()}"
             )
 
-            if key in self.cache:
-                print(f"[+] Using cached value for {key}")
-                travel_times[key] = self.cache[key]
-            elif reverse_key in self.cache:
-                print(f"[+] Using cached value for {reverse_key}")
-                travel_times[key] = self.cache[reverse_key]
-            else:
-                print(f"[*] Handling {origin} and {destination} location request")
-                self.build_distance_matrix_request(origin, destination)
-                self.make_request()
-                travel_time = self.parse_response()
-                self.add_to_cache(key, travel_time)
-                travel_times[key] = travel_time
+            cached = self.cache.get(key)
+            if cached is None:
+                cached = self.cache.get(reverse_key)
+            if cached is not None:
+                travel_times[key] = cached
+                cached_pairs += 1
+                continue
+
+            if self.prefilter is not None and decision_gaps is not None:
+                distance_km = haversine_km(
+                    (origin.lat, origin.long), (destination.lat, destination.long)
+                )
+                gaps = decision_gaps.get(tuple(sorted((origin.id, destination.id))), [])
+                if self.prefilter.decides(distance_km, gaps):
+                    travel_times[key] = self.prefilter.lower_seconds(distance_km)
+                    prefiltered += 1
+                    continue
+
+            uncached_pairs.append((origin, destination))
+
+        fetched = self.fetch_travel_times(uncached_pairs)
+        for key, travel_time in fetched.items():
+            self.add_to_cache(key, travel_time)
+            travel_times[key] = travel_time
+        self.save_cache()
+        failed = len(
+            {(o.to_request_format(), d.to_request_format()) for o, d in uncached_pairs}
+        ) - len(fetched)
+        if failed:
+            print(
+                f"[-] ERROR: {failed} travel time(s) could not be fetched and have not been cached."
+            )
+        run_report.increment("cache.hits", cached_pairs)
+        run_report.increment("cache.misses", len(uncached_pairs))
+        run_report.increment("cache.prefiltered", prefiltered)
+        run_report.increment("api.unfetched_pairs", failed)
+        if cached_pairs:
+            print(f"[+] Using {cached_pairs} cached travel time(s)")
+        if prefiltered:
+            self.number_of_prefiltered_pairs += prefiltered
+            print(
+                f"[+] Skipped {prefiltered} location pair(s) whose travel time can't change any eligibility decision"
+            )
         print("~" * 72)
         return travel_times
 
 
 class LocationManager:
-    def __init__(self, df: pd.DataFrame = None):
+    def __init__(self, df: "pd.DataFrame" = None, site_radius_metres: float = 0):
         """
         Initializes the LocationManager with an optional DataFrame.
         If no DataFrame is provided, the locations will be populated from the 'locations.csv' file.
 
+        Locations are grouped into sites, the physical places they are at, so that pitches at the same venue (e.g.
+        'Peffermill A1' and 'Peffermill A2') share one set of travel times. Travel time to anywhere on the same site is
+        zero. Venue names on their own (e.g. 'Peffermill'), which fixtures may give instead of a pitch, are at their
+        pitches' coordinates and on their site.
+
         :param df: A pandas DataFrame containing location data with columns 'LocationName', 'Latitude', and 'Longitude'.
+        :param site_radius_metres: Locations within this distance of a site's first location are on that site. 0 only
+        groups locations with exactly the same coordinates
         """
         self.locations = {}
+        self.sites = {}
+        self.site_at = {}
+        self.site_of = {}
+        self.venues = {}
+        self.site_radius_metres: float = site_radius_metres
         self.SOURCE = "locations.csv"
         if df is not None:
             self.populate_from_dataframe(df)
@@ -136,9 +511,35 @@ class LocationManager:
 
     def add_location(self, name_: str, latitude_: float, longitude_: float) -> None:
         self.locations[name_] = (latitude_, longitude_)
+        self.assign_site(name_)
+
+    def assign_site(self, name: str) -> None:
+        """
+        Puts a location on the first site it is within site_radius_metres of, or on a new site named after it. A site
+        takes the coordinates of its first location.
+        """
+        coordinates = self.locations[name]
+        site = self.site_at.get(coordinates)
+        if site is None and self.site_radius_metres > 0:
+            site = next(
+                (
+                    other_site
+                    for other_site, other_coordinates in self.sites.items()
+                    if haversine_km(coordinates, other_coordinates) * 1000
+                    <= self.site_radius_metres
+                ),
+                None,
+            )
+        if site is None:
+            site = name
+            self.sites[site] = coordinates
+            self.site_at[coordinates] = site
+        self.site_of[name] = site
 
     def get_location(self, name: str) -> (float, float):
         location = self.locations.get(name)
+        if location is None:
+            location = self.locations.get(self.venue_location(name))
         if location is None:
             raise KeyError(
                 f"Location with name '{name}' not found in the Location Manager. Have you spelt the "
@@ -147,6 +548,23 @@ class LocationManager:
             )
         return location
 
+    def get_site(self, name: str) -> str:
+        """
+        :param name: Location name
+        :return: Name of the site the location is on, which is the name of the site's first location
+        """
+        self.get_location(name)
+        if name in self.site_of:
+            return self.site_of[name]
+        return self.site_of[self.venue_location(name)]
+
+    def venue_location(self, name: str) -> str:
+        """
+        :param name: Location name
+        :return: Name of a location at the venue, if the name is a venue name on its own, otherwise None
+        """
+        return self.venues.get(normalise_location_name(name), [None])[0]
+
     def get_all_locations(self) -> dict:
         return self.locations
 
@@ -166,23 +584,30 @@ class LocationManager:
                 self.add_location(
                     row["LocationName"], float(row["Latitude"]), float(row["Longitude"])
                 )
+        self.venues = find_venues(self.locations)
 
-    def populate_from_dataframe(self, df: pd.DataFrame):
+    def populate_from_dataframe(self, df: "pd.DataFrame"):
         """
-        Populates the LocationManager with data from a pandas DataFrame.
+        Populates the LocationManager with data from a pandas DataFrame, a whole column at a time.
 
         :param df: A pandas DataFrame containing location data with columns 'LocationName', 'Latitude', and 'Longitude'.
         """
-        for _, row in df.iterrows():
-            self.add_location(
-                row["LocationName"], float(row["Latitude"]), float(row["Longitude"])
-            )
+        names = df["LocationName"].tolist()
+        coordinates = zip(
+            df["Latitude"].astype(float).tolist(),
+            df["Longitude"].astype(float).tolist(),
+        )
+        self.locations.update(zip(names, coordinates))
+        for name in names:
+            self.assign_site(name)
+        self.venues = find_venues(self.locations)
 
-    def return_matchday_location_subdictionary(self, locations: [str]) -> dict:
+    def return_matchday_site_subdictionary(self, locations: [str]) -> dict:
         """
-        Returns key-value pairs (location, latlongs) of the match day locations only.
+        Returns key-value pairs (site, latlongs) of the sites the match day locations are on.
 
         :param locations: The list of location names for match day fixtures.
-        :return: Dictionary of location names and latlong values.
+        :return: Dictionary of site names and latlong values, a site per physical place however many of its locations
+        are played at.
         """
-        return {l: self.get_location(l) for l in locations}
+        return {self.get_site(l): self.sites[self.get_site(l)] for l in locations}
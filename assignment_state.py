@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+class AssignmentStateStore:
+    """
+    Stores the inputs and results of every match day of the last run, so the next run only has to recompute the match
+    days that changed. Each match day is stored under its ISO date together with a fingerprint of everything its
+    results depend on.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.days: dict = self.load()
+
+    def load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f).get("days", {})
+        except (json.JSONDecodeError, AttributeError):
+            print(f"[-] {self.path} is not a valid state file, recomputing every match day.")
+            return {}
+
+    def get_day(self, match_date: str, fingerprint: str) -> dict:
+        """
+        :param match_date: ISO format date of the match day
+        :param fingerprint: Fingerprint of the match day as it is now
+        :return: The stored record of the match day, or None if there isn't one or the match day has changed
+        """
+        record = self.days.get(match_date)
+        if record is None or record.get("fingerprint") != fingerprint:
+            return None
+        return record
+
+    def save(self, days: dict) -> None:
+        """
+        Replaces the stored match days, writing the file atomically so a crash can't leave it half written
+        :param days: Dictionary of ISO format dates and match day records
+        """
+        self.days = days
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as f:
+            json.dump({"days": days}, f)
+        os.replace(f.name, self.path)
+
+
+def fingerprint(*parts) -> str:
+    """
+    Hashes any JSON serialisable values into a short, stable fingerprint
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,90 @@
+import datetime
+import math
+from bisect import bisect_left
+
+from models import Fixture, to_epoch_minutes
+
+
+class TeamAvailabilityCalendar:
+    """
+    Keeps track of when each team is busy on each match day, so that "is team X free to cover fixture Y" can be
+    answered with a binary search instead of comparing fixture Y against every other fixture.
+
+    A team is busy from the pushback of each of its own games until the final whistle. When checking a fixture at a
+    given venue, each of those busy intervals is widened on both sides by the travel time between the venue of the
+    team's own game and the venue of the fixture being checked. The widened intervals are merged, sorted and cached
+    per (team, date, venue), so every fixture at the same venue on the same day reuses the same calendar.
+    """
+
+    def __init__(
+        self, fixtures_by_team_and_date: dict, location_ids: dict, travel_time_matrix
+    ):
+        """
+        :param fixtures_by_team_and_date: Dictionary where key is a (team, date) tuple, and the values are lists of
+        Fixture objects that team is playing on that date
+        :param location_ids: Dictionary of location names and the integer IDs of their sites
+        :param travel_time_matrix: Square NumPy array of travel times in minutes, indexed by location ID
+        """
+        self.fixtures_by_team_and_date: dict = fixtures_by_team_and_date
+        self.location_ids: dict = location_ids
+        self.travel_time_matrix = travel_time_matrix
+        self.busy_intervals: dict = {}
+
+    def get_busy_intervals(
+        self, team: str, match_date: datetime.date, location: str
+    ) -> ([float], [float]):
+        """
+        Returns the merged intervals a team is unavailable for covering a game at a given location on a given date
+        :param team: Name of the team
+        :param match_date: The date of the match day
+        :param location: Name of the location of the game to be covered
+        :return: Tuple of two sorted lists, the start and end of each busy interval in epoch minutes
+        """
+        key = (team, match_date, location)
+        if key in self.busy_intervals:
+            return self.busy_intervals[key]
+
+        destination = self.location_ids[location]
+        widened = []
+        for fixture in self.fixtures_by_team_and_date.get((team, match_date), []):
+            travel_time_minutes = self.travel_time_matrix[
+                self.location_ids[fixture.location], destination
+            ]
+            if math.isnan(travel_time_minutes):
+                raise ValueError(
+                    f"Travel time not found for the given origin `{fixture.location}` and destination {location}."
+                )
+            widened.append(
+                (
+                    to_epoch_minutes(fixture.start_time) - travel_time_minutes,
+                    to_epoch_minutes(fixture.end_time) + travel_time_minutes,
+                )
+            )
+        widened.sort()
+
+        starts, ends = [], []
+        for start, end in widened:
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+
+        self.busy_intervals[key] = (starts, ends)
+        return starts, ends
+
+    def is_available(self, team: str, fixture: Fixture) -> bool:
+        """
+        Checks whether a team is free to cover a fixture, that is the fixture does not fall inside any of the team's
+        busy intervals once travel time to the fixture's venue is accounted for.
+        :param team: Name of the team
+        :param fixture: Fixture object representing the match to be covered
+        :return: True if the team is free, False if not
+        """
+        starts, ends = self.get_busy_intervals(
+            team, fixture.start_time.date(), fixture.location
+        )
+        # The last busy interval starting before the fixture ends is the only one that can clash with it, because the
+        # merged intervals are disjoint and so their end times are sorted too.
+        i = bisect_left(starts, to_epoch_minutes(fixture.end_time))
+        return i == 0 or ends[i - 1] <= to_epoch_minutes(fixture.start_time)
@@ -0,0 +1,199 @@
+import argparse
+import datetime
+import json
+import platform
+import random
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+import buzzbot
+import utils
+from buzzbot_constants import buzzbotConfiguration
+from distance_matrix_stub import DistanceMatrixStubServer
+from gspread_interface import GoogleSheetManager
+from heuristics import GreedyFair
+from instrumentation import run_report
+from sheet_layout import build_assignments_grid
+
+DEFAULT_SIZES = [60, 500, 5000, 50000]
+PHASES = ["load", "travel_table", "eligibility", "selection", "sheet_grid"]
+
+
+class PhaseTimer:
+    """
+    Records the wall clock time spent in each phase of a run
+    """
+
+    def __init__(self):
+        self.seconds: dict = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + (
+                time.perf_counter() - start
+            )
+
+
+def synthetic_teams(number_of_teams: int) -> [str]:
+    return [f"{i}s" for i in range(1, number_of_teams + 1)]
+
+
+def synthetic_venues(number_of_venues: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Places venues at random around the central belt of Scotland, with Peffermill as the home venue
+    :param number_of_venues: Number of venues, including Peffermill
+    :param seed: Seed for the random number generator
+    :return: DataFrame with the columns LocationManager expects
+    """
+    rng = random.Random(seed)
+    rows = [{"LocationName": "Peffermill", "Latitude": 55.93, "Longitude": -3.15}]
+    for i in range(1, number_of_venues):
+        rows.append(
+            {
+                "LocationName": f"Venue {i}",
+                "Latitude": rng.uniform(55.5, 56.5),
+                "Longitude": rng.uniform(-4.5, -2.5),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def run_benchmark(
+    number_of_fixtures: int,
+    number_of_teams: int = 7,
+    number_of_venues: int = 22,
+    seed: int = 0,
+) -> dict:
+    """
+    Times every phase of an assignment run on a generated season, with travel times served by the local distance
+    matrix stub so nothing goes over the network. The travel time cache starts empty, so the travel table is built
+    cold every time.
+
+    :param number_of_fixtures: Number of fixtures in the season
+    :param number_of_teams: Number of uni teams
+    :param number_of_venues: Number of venues
+    :param seed: Seed for generating the season and the venues
+    :return: Dictionary of the run's parameters, seconds spent in each phase and counters
+    """
+    teams = synthetic_teams(number_of_teams)
+    venues = synthetic_venues(number_of_venues, seed)
+    records = utils.generate_fixture_records(
+        number_of_fixtures, teams, list(venues["LocationName"]), seed=seed
+    )
+    timer = PhaseTimer()
+    run_report.reset()
+
+    with DistanceMatrixStubServer() as server:
+        distance_matrix_settings = buzzbotConfiguration.settings["distance_matrix_ai"]
+        distance_matrix_settings["endpoint"] = server.endpoint
+        distance_matrix_settings["cache_backend"] = "memory"
+        distance_matrix_settings["requests_per_second"] = 0
+        distance_matrix_settings["lazy_resolution"] = False
+        buzzbotConfiguration.settings.setdefault("engine", {})["state_file"] = None
+
+        with timer.phase("load"):
+            fixtures = GoogleSheetManager.fixtures_from_records(records)
+
+        with timer.phase("travel_table"):
+            bot = buzzbot.BuzzBot(
+                fixtures,
+                teams,
+                {team: 0 for team in teams},
+                GreedyFair(),
+                locations_df=venues,
+            )
+        matches_by_date = bot.group_matches_by_date()
+
+        with timer.phase("eligibility"):
+            bot.compute_eligibility(matches_by_date)
+            bot.count_eligibility(matches_by_date)
+
+        with timer.phase("selection"):
+            if bot.selection_scope == "season":
+                bot.select_covering_teams(
+                    [match for day in matches_by_date.values() for match in day]
+                )
+            else:
+                for day_matches in matches_by_date.values():
+                    bot.select_covering_teams(day_matches)
+
+        with timer.phase("sheet_grid"):
+            games = sorted(bot.matches, key=lambda x: x.start_time)
+            grid = build_assignments_grid(games)
+
+    return {
+        "fixtures": number_of_fixtures,
+        "teams": number_of_teams,
+        "venues": number_of_venues,
+        "seed": seed,
+        "match_days": len(matches_by_date),
+        "eligibility_engine": bot.eligibility_engine,
+        "workers": bot.workers,
+        "selection_scope": bot.selection_scope,
+        "api_requests": bot.api.number_of_requests,
+        "prefiltered_pairs": bot.api.number_of_prefiltered_pairs,
+        "sheet_rows": len(grid),
+        "phases": {phase: timer.seconds.get(phase, 0.0) for phase in PHASES},
+        "total_seconds": sum(timer.seconds.values()),
+        "counters": run_report.to_dict()["counters"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark every phase of an assignment run on generated seasons, offline"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Season sizes to benchmark, in fixtures",
+    )
+    parser.add_argument("--teams", type=int, default=7)
+    parser.add_argument("--venues", type=int, default=22)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--engine", choices=buzzbot.ENGINES, help="Override engine.eligibility"
+    )
+    parser.add_argument("--workers", type=int, help="Override engine.workers")
+    parser.add_argument(
+        "--output",
+        default="benchmark_results.json",
+        help="File the results are written to as JSON",
+    )
+    args = parser.parse_args()
+
+    engine_settings = buzzbotConfiguration.settings.setdefault("engine", {})
+    if args.engine:
+        engine_settings["eligibility"] = args.engine
+    if args.workers is not None:
+        engine_settings["workers"] = args.workers
+
+    results = []
+    for size in args.sizes:
+        result = run_benchmark(size, args.teams, args.venues, args.seed)
+        results.append(result)
+        phases = ", ".join(
+            f"{phase} {seconds:.3f}s" for phase, seconds in result["phases"].items()
+        )
+        print(f"[+] {size} fixtures: {result['total_seconds']:.3f}s total ({phases})")
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"[+] Results written to {args.output}")
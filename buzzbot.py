@@ -1,53 +1,83 @@
-import csv
 import datetime
+import itertools
+import os
 import utils
 import logging
 
+import numpy as np
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from itertools import groupby
 from operator import attrgetter
 
-from DistanceMatrixAPI import DistanceMatrixInterface, LocationManager
+from DistanceMatrixAPI import (
+    DEFAULT_ENDPOINT,
+    DistanceMatrixInterface,
+    LocationManager,
+    TravelTimeBounds,
+)
+from assignment_state import AssignmentStateStore, fingerprint
+from availability import TeamAvailabilityCalendar
+from eligibility import (
+    ENGINES,
+    compute_day_eligibility,
+    compute_day_eligibility_table,
+    compute_eligibility_matrix,
+    eligible_teams_from_row,
+    init_eligibility_worker,
+)
 from buzzbot_constants import buzzbotConfiguration
+from fixture_loader import FixtureLoader
 from heuristics import SelectionFunction
-from models import Fixture
-
+from instrumentation import run_report
+from models import Fixture, FixtureTable, to_epoch_minutes
 
-# Configuring logger
+# Engine logger, sent to a file by configure_logging
 logger = logging.getLogger("TheBuzzBot Logger")
-logger.setLevel(logging.DEBUG)
-fh = logging.FileHandler("buzzbot.log", mode="a")  # "a" for append
-fh.setLevel(logging.DEBUG)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-fh.setFormatter(formatter)
-logger.addHandler(fh)
 
 
-def load_fixtures_from_csv(csv_path):
-    matches_ = []
-    errors_exist, error_messages = utils.validate_csv_format(csv_path)
-    if errors_exist:
-        raise utils.ExceptionWithList(error_messages)
+def configure_logging(log_file: str = None, level: str = None) -> None:
+    """
+    Sends the engine's log to a file. This is up to the entry point, so importing buzzbot has no side effects.
+    :param log_file: File the log is appended to, defaults to logging.file in configuration.yaml
+    :param level: Name of the lowest level that is logged, defaults to logging.level in configuration.yaml. Below
+    DEBUG, the eligibility checks don't spend any time on logging at all.
+    """
+    logging_settings = buzzbotConfiguration.settings.get("logging", {})
+    logger.setLevel(level or logging_settings.get("level", "INFO"))
+    if any(isinstance(h, logging.FileHandler) for h in logger.handlers):
+        return
+    fh = logging.FileHandler(
+        log_file or logging_settings.get("file", "buzzbot.log"), mode="a"
+    )  # "a" for append
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    fh.setFormatter(formatter)
+    logger.addHandler(fh)
+
 
+def load_fixtures_from_csv(csv_path):
+    """
+    Reads the fixtures of a CSV file, validating and parsing every row in the same pass
+    :param csv_path: Path of the CSV file
+    :return: List of Fixtures
+    :raises utils.ExceptionWithList: If any row is invalid, listing every problem found
+    """
+    loader = FixtureLoader(
+        buzzbotConfiguration.settings["teams"], utils.get_location_index()
+    )
     try:
-        with open(csv_path, newline="") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                home = row["uni_team"].strip()
-                away = row["opposition"].strip()
-                start_time = datetime.datetime.strptime(
-                    row["start_time"].strip(), "%Y-%m-%d %H:%M:%S"
-                )
-                umpires_needed = int(row["umpires_needed"].strip())
-                location = row["location"].strip()
-                matches_.append(
-                    Fixture(home, away, start_time, umpires_needed, location)
-                )
-        return matches_
+        matches_ = list(loader.iter_csv(csv_path))
     except Exception as e:
         raise Exception(
             f"You have been an idiot somewhere with the input.csv file. Read the following message to "
             f"gauge what the issue is : '{str(e)}'"
         )
+    if loader.errors:
+        raise utils.ExceptionWithList(loader.errors)
+    return matches_
 
 
 class BuzzBot:
@@ -62,47 +92,270 @@ class BuzzBot:
         umpiring_count_: dict,
         criteria_: SelectionFunction,
         locations_df=None,
+        api_: DistanceMatrixInterface = None,
     ):
         self.matches: [Fixture] = matches_
         self.teams: [str] = teams_
+        self.fixtures_by_team_and_date: dict = self.build_fixture_index()
         self.umpiring_count: dict = umpiring_count_
+        distance_matrix_settings = buzzbotConfiguration.settings["distance_matrix_ai"]
         self.location_manager: LocationManager = LocationManager(
-            df=(locations_df if locations_df is not None else None)
+            df=(locations_df if locations_df is not None else None),
+            site_radius_metres=distance_matrix_settings.get("site_radius_metres", 0),
         )
-        self.api: DistanceMatrixInterface = DistanceMatrixInterface(
-            buzzbotConfiguration.settings["distance_matrix_ai"]
+        # An API interface kept from an earlier run brings its warm travel time cache and HTTP session with it
+        self.api: DistanceMatrixInterface = (
+            api_ if api_ is not None else self.create_api(distance_matrix_settings)
         )
+        self.site_ids: dict = {}
+        self.location_ids: dict = {}
         self.bootstrap_api()
-        self.travel_time_table: dict = self.api.get_travel_time_table()
+        self.decision_gaps: dict = self.compute_decision_gaps()
+        self.lazy_resolution: bool = distance_matrix_settings.get(
+            "lazy_resolution", False
+        )
+        engine_settings = buzzbotConfiguration.settings.get("engine", {})
+        self.workers: int = engine_settings.get("workers", 1) or os.cpu_count()
+        self.parallel_min_fixtures: int = engine_settings.get(
+            "parallel_min_fixtures", 1000
+        )
+        self.eligibility_engine: str = engine_settings.get("eligibility", "calendar")
+        self.selection_scope: str = buzzbotConfiguration.settings.get(
+            "selection", {}
+        ).get("scope", "day")
+        if self.eligibility_engine not in ENGINES:
+            raise ValueError(
+                f"Unknown eligibility engine '{self.eligibility_engine}'. Expected one of {ENGINES}."
+            )
+        state_file = engine_settings.get("state_file")
+        self.state_store: AssignmentStateStore = (
+            AssignmentStateStore(state_file) if state_file else None
+        )
+        self.resolved_dates: set = set()
+        self.locations_by_date: dict = {}
+        for match in self.matches:
+            self.locations_by_date.setdefault(match.start_time.date(), set()).add(
+                match.location
+            )
+        self.travel_time_table: dict = {}
+        if not self.lazy_resolution:
+            with run_report.span("travel_times"):
+                self.travel_time_table = self.api.get_travel_time_table(
+                    self.decision_gaps
+                )
+        self.travel_time_matrix: np.ndarray = self.build_travel_time_matrix()
+        self.availability: TeamAvailabilityCalendar = TeamAvailabilityCalendar(
+            self.fixtures_by_team_and_date, self.location_ids, self.travel_time_matrix
+        )
         self.assignments: dict = {}
         self.selection_criteria: SelectionFunction = criteria_
+        self.selection_deadline: float = None
+        rejection_buffer_size = buzzbotConfiguration.settings.get("logging", {}).get(
+            "rejection_buffer_size", 0
+        )
+        self.rejections: deque = (
+            deque(maxlen=rejection_buffer_size) if rejection_buffer_size else None
+        )
+        self.log_rejections: bool = logger.isEnabledFor(logging.DEBUG)
+
+    def build_fixture_index(self) -> dict:
+        """
+        Indexes the fixtures by the teams playing in them and the date they are played on, so that eligibility checks
+        only have to look at the games a team plays on the same day as the fixture being covered.
+        :return: a dictionary where key is a (team, date) tuple, and the values are lists of Fixture objects sorted by
+        start time
+        """
+        index = {}
+        for match in self.matches:
+            match_date = match.start_time.date()
+            for team in {match.home, match.away}:
+                index.setdefault((team, match_date), []).append(match)
+        for fixtures in index.values():
+            fixtures.sort(key=attrgetter("start_time"))
+        return index
+
+    def get_team_fixtures_on_date(
+        self, team: str, match_date: datetime.date
+    ) -> [Fixture]:
+        """
+        Returns the fixtures a team is playing on a given date
+        :param team: Name of the team
+        :param match_date: The date of the match day
+        :return: List of Fixture objects sorted by start time, empty if the team isn't playing that day
+        """
+        return self.fixtures_by_team_and_date.get((team, match_date), [])
 
     def extract_location_names(self) -> [str]:
         return [m.location for m in self.matches]
 
-    def extract_location_coordinates(self, location_names_: [str]) -> [(float, float)]:
+    def bootstrap_api(self) -> None:
         """
-        Returns a list of coordinates from a list of given location names
-        :param location_names_: List of strings representing location names
-        :return: List of tuples of floats representing the lat long pairs for each location
+        Initialising the Distance Matrix API with the sites of the match day locations, and interning each site to the
+        integer ID used to index the travel time matrix. Every location is given the ID of its site, so travel times
+        are only ever fetched between different sites.
         """
-        coords = []
-        for name in location_names_:
-            coord = self.location_manager.get_location(name)
-            coords.append(coord)
-        return coords
+        matchday_locations = self.extract_location_names()
+        matchday_sites_dict = self.location_manager.return_matchday_site_subdictionary(
+            matchday_locations
+        )
+        self.site_ids = {site: i for i, site in enumerate(matchday_sites_dict)}
+        self.location_ids = {
+            name: self.site_ids[self.location_manager.get_site(name)]
+            for name in matchday_locations
+        }
+        self.api.import_from_LocationManager(matchday_sites_dict)
 
-    def bootstrap_api(self) -> None:
+    def create_api(self, distance_matrix_settings: dict) -> DistanceMatrixInterface:
         """
-        Initialising the Distance Matrix API with the match day locations
+        Creates the Distance Matrix API interface from the 'distance_matrix_ai' settings
+        :param distance_matrix_settings: The 'distance_matrix_ai' section of the settings
+        :return: DistanceMatrixInterface object
         """
-        matchday_locations = self.extract_location_names()
-        matchday_locations_dict = (
-            self.location_manager.return_matchday_location_subdictionary(
-                matchday_locations
-            )
+        return DistanceMatrixInterface(
+            distance_matrix_settings["api_key"],
+            batch_requests_=distance_matrix_settings.get("batch_requests", True),
+            max_origins_=distance_matrix_settings.get("max_origins", 25),
+            max_destinations_=distance_matrix_settings.get("max_destinations", 25),
+            max_elements_=distance_matrix_settings.get("max_elements", 100),
+            endpoint_=distance_matrix_settings.get("endpoint", DEFAULT_ENDPOINT),
+            max_workers_=distance_matrix_settings.get("max_workers", 4),
+            requests_per_second_=distance_matrix_settings.get("requests_per_second", 5),
+            max_retries_=distance_matrix_settings.get("max_retries", 3),
+            backoff_seconds_=distance_matrix_settings.get("backoff_seconds", 0.5),
+            timeout_seconds_=distance_matrix_settings.get("timeout_seconds", 10),
+            cache_backend_=distance_matrix_settings.get("cache_backend", "json"),
+            cache_file_=distance_matrix_settings.get("cache_file"),
+            prefilter_=self.build_prefilter(
+                distance_matrix_settings.get("prefilter", {})
+            ),
         )
-        self.api.import_from_LocationManager(matchday_locations_dict)
+
+    @staticmethod
+    def build_prefilter(prefilter_settings: dict) -> TravelTimeBounds:
+        """
+        Builds the travel time bounds used to skip API calls for location pairs whose travel time can't change any
+        eligibility decision
+        :param prefilter_settings: The 'prefilter' section of the distance_matrix_ai settings
+        :return: TravelTimeBounds object, or None if the prefilter is disabled
+        """
+        if not prefilter_settings or not prefilter_settings.get("enabled", True):
+            return None
+        return TravelTimeBounds(
+            max_speed_kmh=prefilter_settings.get("max_speed_kmh", 120.0),
+            detour_factor=prefilter_settings.get("detour_factor", 2.5),
+            min_speed_kmh=prefilter_settings.get("min_speed_kmh", 25.0),
+            overhead_minutes=prefilter_settings.get("overhead_minutes", 10.0),
+        )
+
+    def compute_decision_gaps(self) -> dict:
+        """
+        For every pair of sites with games on the same day, computes the gaps between those games. The travel time
+        between two sites decides whether a team playing at one can cover a game at the other by comparing it
+        against these gaps, and nothing else.
+        :return: Dictionary where key is a sorted tuple of two site names, and the values are lists of gaps in
+        minutes (negative if the games overlap)
+        """
+        gaps = {}
+        matches_by_date = groupby(
+            sorted(self.matches, key=lambda x: x.start_time),
+            key=lambda x: x.start_time.date(),
+        )
+        for _, day_matches in matches_by_date:
+            day_matches = [
+                (
+                    self.location_manager.get_site(m.location),
+                    to_epoch_minutes(m.start_time),
+                    to_epoch_minutes(m.end_time),
+                )
+                for m in day_matches
+            ]
+            for i, (location, start, end) in enumerate(day_matches):
+                for other_location, other_start, other_end in day_matches[i + 1 :]:
+                    if location == other_location:
+                        continue
+                    key = tuple(sorted((location, other_location)))
+                    gaps.setdefault(key, []).append(
+                        max(other_start - end, start - other_end)
+                    )
+        return gaps
+
+    def build_travel_time_matrix(self) -> np.ndarray:
+        """
+        Builds a dense, symmetric matrix of travel times in minutes between every pair of match day sites, indexed by
+        site ID. Pairs missing from the travel time table are NaN.
+        :return: Square NumPy array of floats
+        """
+        coords = [self.location_manager.sites[site] for site in self.site_ids]
+        matrix = np.full((len(coords), len(coords)), np.nan)
+        for i, origin in enumerate(coords):
+            matrix[i, i] = 0
+            for j in range(i + 1, len(coords)):
+                try:
+                    matrix[i, j] = matrix[j, i] = self.get_travel_time(
+                        origin, coords[j]
+                    )
+                except ValueError:
+                    continue
+        return matrix
+
+    def resolve_travel_times_for_date(self, match_date: datetime.date) -> None:
+        """
+        Makes sure the travel time matrix holds the travel time between every pair of locations played at on a given
+        date, fetching the missing ones in one batch. Only used in lazy resolution mode, where travel times are
+        resolved a match day at a time as the eligibility checks need them, instead of for every pair of locations
+        in the season up front. Each date is only resolved once.
+        :param match_date: The date of the match day
+        """
+        if match_date in self.resolved_dates:
+            return
+        self.resolved_dates.add(match_date)
+
+        day_sites = sorted(
+            {
+                self.location_manager.get_site(location)
+                for location in self.locations_by_date.get(match_date, ())
+            }
+        )
+        missing_pairs = [
+            (origin, destination)
+            for origin, destination in itertools.combinations(day_sites, 2)
+            if np.isnan(
+                self.travel_time_matrix[
+                    self.site_ids[origin], self.site_ids[destination]
+                ]
+            )
+        ]
+        if not missing_pairs:
+            return
+
+        with run_report.span("travel_times"):
+            day_travel_times = self.api.get_travel_time_table(
+                self.decision_gaps,
+                pairs=[
+                    (
+                        self.api.locations[self.site_ids[origin]],
+                        self.api.locations[self.site_ids[destination]],
+                    )
+                    for origin, destination in missing_pairs
+                ],
+            )
+        self.travel_time_table.update(day_travel_times)
+        self.update_travel_time_matrix(missing_pairs)
+
+    def update_travel_time_matrix(self, site_pairs: [(str, str)]) -> None:
+        """
+        Copies the travel times for the given site pairs from the travel time table into the travel time matrix
+        :param site_pairs: List of tuples of two site names
+        """
+        for origin, destination in site_pairs:
+            origin_coords = self.location_manager.sites[origin]
+            destination_coords = self.location_manager.sites[destination]
+            try:
+                travel_time = self.get_travel_time(origin_coords, destination_coords)
+            except ValueError:
+                continue
+            i, j = self.site_ids[origin], self.site_ids[destination]
+            self.travel_time_matrix[i, j] = self.travel_time_matrix[j, i] = travel_time
 
     def group_matches_by_date(self) -> dict:
         """
@@ -120,30 +373,283 @@ class BuzzBot:
         """
         if len(self.matches) == 0:
             return
+        # Checked once per run rather than once per eligibility check
+        self.log_rejections = logger.isEnabledFor(logging.DEBUG)
         matches_by_date = self.group_matches_by_date()
 
-        for match_date, day_matches in matches_by_date.items():
-            for match in day_matches:
-                self.assign_team_to_match_single_matchday(match)
+        # Match days whose fixtures are unchanged since the last run reuse their stored results.
+        fingerprints = {
+            match_date: self.fingerprint_match_day(day_matches)
+            for match_date, day_matches in matches_by_date.items()
+        }
+        stored_days = {}
+        if self.state_store is not None:
+            for match_date, day_matches in matches_by_date.items():
+                record = self.state_store.get_day(
+                    match_date.isoformat(), fingerprints[match_date]
+                )
+                if record is not None:
+                    stored_days[match_date] = record
+                    for match, eligible_teams in zip(
+                        day_matches, record["eligible_teams"]
+                    ):
+                        match.eligible_teams = eligible_teams
+            print(
+                f"[+] {len(stored_days)} of {len(matches_by_date)} match day(s) unchanged since the last run"
+            )
+
+        run_report.increment("match_days", len(matches_by_date))
+        run_report.increment("match_days.eligibility_reused", len(stored_days))
+
+        # Phase 1: eligibility. Match days are independent of each other, so they can be computed in parallel.
+        with run_report.span("eligibility"):
+            changed_days = {
+                match_date: day_matches
+                for match_date, day_matches in matches_by_date.items()
+                if match_date not in stored_days
+            }
+            self.compute_eligibility(changed_days)
+            self.count_eligibility(changed_days)
+
+        # Phase 2: selection. The umpiring counts couple the match days, so this runs in date order, either a match day
+        # at a time or for the whole season at once. A match day's stored selections are only reused if the umpiring
+        # counts going into it are also unchanged. Every match day shares the selection criteria's time budget.
+        counts_before, counts_after = {}, {}
+        self.selection_deadline = self.selection_criteria.deadline()
+        with run_report.span("selection"):
+            if self.selection_scope == "season":
+                self.select_covering_teams(
+                    [
+                        match
+                        for day_matches in matches_by_date.values()
+                        for match in day_matches
+                    ]
+                )
+            else:
+                for match_date, day_matches in matches_by_date.items():
+                    counts_before[match_date] = dict(self.umpiring_count)
+                    record = stored_days.get(match_date)
+                    if (
+                        record is not None
+                        and record["counts_before"] == counts_before[match_date]
+                    ):
+                        for match, covering_team in zip(
+                            day_matches, record["covering_teams"]
+                        ):
+                            match.covering_team = covering_team
+                        self.umpiring_count.update(record["counts_after"])
+                        run_report.increment("match_days.selection_reused")
+                    else:
+                        self.select_covering_teams(day_matches)
+                    counts_after[match_date] = dict(self.umpiring_count)
+
+        if self.state_store is not None:
+            with run_report.span("save_state"):
+                self.save_state(
+                    matches_by_date, fingerprints, counts_before, counts_after
+                )
+        self.flush_rejections()
 
         if print_results:
             self.print_results()
 
-    def assign_team_to_match_single_matchday(self, match: Fixture) -> None:
+    def fingerprint_match_day(self, day_matches: [Fixture]) -> str:
         """
-        Assigns a covering team to a single match, using only the matches on that match day.
-        :param match: Fixture object
+        Fingerprints everything the results of a match day depend on, apart from the umpiring counts going into it:
+        its fixtures in order, the sites they are played at and how locations are grouped into sites, the travel times
+        between those sites, the teams and the selection criteria. In lazy resolution mode the travel times aren't
+        known until the match day is computed, so only the sites are fingerprinted.
+        :param day_matches: List of the Fixture objects played on the match day
+        :return: Fingerprint as a hex string
         """
-        if match.umpires_required == 0:
-            match.covering_team = "COVERED"
+        day_site_ids = sorted({self.location_ids[m.location] for m in day_matches})
+        travel_times = None
+        if not self.lazy_resolution:
+            travel_times = self.travel_time_matrix[
+                np.ix_(day_site_ids, day_site_ids)
+            ].tolist()
+        return fingerprint(
+            [
+                (
+                    m.home,
+                    m.away,
+                    m.start_time.isoformat(),
+                    m.umpires_required,
+                    m.location,
+                    self.location_manager.sites[
+                        self.location_manager.get_site(m.location)
+                    ],
+                )
+                for m in day_matches
+            ],
+            self.location_manager.site_radius_metres,
+            travel_times,
+            self.teams,
+            type(self.selection_criteria).__name__,
+            self.selection_scope,
+        )
+
+    def save_state(
+        self,
+        matches_by_date: dict,
+        fingerprints: dict,
+        counts_before: dict,
+        counts_after: dict,
+    ) -> None:
+        """
+        Stores the inputs and results of every match day, for the next run to reuse
+        :param matches_by_date: a dictionary where key is the date, and the values are list of Fixture objects
+        :param fingerprints: a dictionary where key is the date, and the values are the match day fingerprints
+        :param counts_before: a dictionary where key is the date, and the values are the umpiring counts going into
+        the match day. Empty when the selection was made for the whole season at once.
+        :param counts_after: a dictionary where key is the date, and the values are the umpiring counts coming out of
+        the match day. Empty when the selection was made for the whole season at once.
+        """
+        self.state_store.save(
+            {
+                match_date.isoformat(): {
+                    "fingerprint": fingerprints[match_date],
+                    "eligible_teams": [m.eligible_teams for m in day_matches],
+                    "covering_teams": [m.covering_team for m in day_matches],
+                    "counts_before": counts_before.get(match_date),
+                    "counts_after": counts_after.get(match_date),
+                }
+                for match_date, day_matches in matches_by_date.items()
+            }
+        )
+
+    def compute_eligibility(self, matches_by_date: dict) -> None:
+        """
+        Computes the eligible covering teams of every match that needs umpires, and stores them on the match. Large
+        inputs are spread across a process pool, one match day per task, with the travel time matrix shared read-only
+        by every worker. Small inputs are computed in this process, where starting workers would cost more than it
+        saves.
+
+        The 'calendar' engine checks each team against each match with is_eligible. The 'matrix' engine computes the
+        whole teams x matches eligibility matrix of a match day in one vectorised pass.
+        :param matches_by_date: a dictionary where key is the date, and the values are list of Fixture objects
+        """
+        if self.workers <= 1 or len(self.matches) < self.parallel_min_fixtures:
+            for match_date, day_matches in matches_by_date.items():
+                if self.eligibility_engine == "matrix":
+                    self.compute_day_eligibility_matrix(match_date, day_matches)
+                    continue
+                for match in day_matches:
+                    if match.umpires_required != 0:
+                        match.eligible_teams = sorted(self.get_eligible_teams(match))
             return
 
-        selected_team = self.find_umpiring_team(match)
-        match.covering_team = selected_team
-        if selected_team != "No available umpire":
-            self.umpiring_count[selected_team] = (
-                self.umpiring_count.get(selected_team, 0) + match.umpires_required
+        if self.lazy_resolution:
+            for match_date in matches_by_date:
+                self.resolve_travel_times_for_date(match_date)
+
+        days = list(matches_by_date.values())
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_eligibility_worker,
+            initargs=(self.teams, self.location_ids, self.travel_time_matrix),
+        ) as executor:
+            chunksize = max(1, len(days) // (self.workers * 4))
+            if self.eligibility_engine == "matrix":
+                # Match days are sent as FixtureTables, a few arrays each, instead of pickling every Fixture
+                tables = [
+                    FixtureTable(day_matches, self.teams, self.location_ids)
+                    for day_matches in days
+                ]
+                for day_matches, eligibility_matrix in zip(
+                    days,
+                    executor.map(
+                        compute_day_eligibility_table, tables, chunksize=chunksize
+                    ),
+                ):
+                    for match, row in zip(day_matches, eligibility_matrix):
+                        if match.umpires_required != 0:
+                            match.eligible_teams = eligible_teams_from_row(
+                                row, self.teams
+                            )
+                return
+
+            for day_matches, eligibility in zip(
+                days, executor.map(compute_day_eligibility, days, chunksize=chunksize)
+            ):
+                for match, eligible_teams in zip(day_matches, eligibility):
+                    if match.umpires_required != 0:
+                        match.eligible_teams = eligible_teams
+
+    def count_eligibility(self, matches_by_date: dict) -> None:
+        """
+        Adds the eligibility checks made for the given matches, and the teams rejected by them by reason, to the run
+        report. Worked out from the eligible teams of each match rather than counted check by check, so it costs the
+        same whichever engine computed them and wherever it ran.
+        :param matches_by_date: a dictionary where key is the date, and the values are list of Fixture objects
+        """
+        teams = set(self.teams)
+        checks = playing = eligible = 0
+        for day_matches in matches_by_date.values():
+            for match in day_matches:
+                if match.umpires_required == 0:
+                    continue
+                checks += len(teams)
+                playing += len(teams & {match.home, match.away})
+                eligible += len(match.eligible_teams)
+        run_report.increment("eligibility.checks", checks)
+        run_report.increment("eligibility.rejections.playing", playing)
+        run_report.increment(
+            "eligibility.rejections.unavailable", checks - playing - eligible
+        )
+
+    def compute_day_eligibility_matrix(
+        self, match_date: datetime.date, day_matches: [Fixture]
+    ) -> None:
+        """
+        Computes the eligible covering teams of every match on a match day from the vectorised eligibility matrix, and
+        stores them on the matches that need umpires
+        :param match_date: The date of the match day
+        :param day_matches: List of all the Fixture objects played on the match day
+        """
+        if self.lazy_resolution:
+            self.resolve_travel_times_for_date(match_date)
+        eligibility_matrix = compute_eligibility_matrix(
+            day_matches, self.teams, self.location_ids, self.travel_time_matrix
+        )
+        for match, row in zip(day_matches, eligibility_matrix):
+            if match.umpires_required != 0:
+                match.eligible_teams = eligible_teams_from_row(row, self.teams)
+                if self.log_rejections:
+                    for team, eligible in zip(self.teams, row):
+                        if not eligible:
+                            self.record_rejection(
+                                team,
+                                match,
+                                "is playing or can't make it in time for fixture",
+                            )
+
+    def select_covering_teams(self, matches: [Fixture]) -> None:
+        """
+        Selects the covering teams for a sequence of matches, using the eligible teams already computed for them, in
+        one call to the selection criteria so that it can weigh the matches against each other.
+        :param matches: List of Fixture objects in date order
+        """
+        needing_umpires = []
+        for match in matches:
+            if match.umpires_required == 0:
+                match.covering_team = "COVERED"
+            else:
+                needing_umpires.append(match)
+
+        selections = self.selection_criteria.assign(
+            [match.eligible_teams for match in needing_umpires],
+            [match.umpires_required for match in needing_umpires],
+            self.umpiring_count,
+            availability=self.availability,
+            deadline=self.selection_deadline,
+        )
+        for match, selected_team in zip(needing_umpires, selections):
+            match.covering_team = (
+                selected_team if selected_team is not None else "No available umpire"
             )
+        run_report.increment("selection.fixtures", len(needing_umpires))
+        run_report.increment("selection.no_available_umpire", selections.count(None))
 
     def print_results(self) -> None:
         """
@@ -168,24 +674,6 @@ class BuzzBot:
         print("\n")
         print(f"TOTAL UMPIRES SUPPLIED: {self.get_total_umpires_supplied()}")
 
-    def find_umpiring_team(self, match: Fixture) -> str:
-        """
-        Finds the best team to cover a match based on defined criteria
-        :param match: Fixture object
-        :return: String name of the best team to cover a match
-        """
-        eligible_teams = self.get_eligible_teams(match)
-        eligible_teams.sort()
-        match.eligible_teams = eligible_teams
-        if not eligible_teams:
-            return "No available umpire"
-
-        best_team = self.selection_criteria.evaluate(
-            eligible_teams, umpiring_count=self.umpiring_count
-        )
-        # Greedy heuristic that takes the team with the least assignments first, then the strongest team.
-        return best_team
-
     def get_eligible_teams(self, match: Fixture) -> [str]:
         """
         Computes the list of teams eligible for covering a match
@@ -228,60 +716,66 @@ class BuzzBot:
         :param match: Fixture object representing the match to check eligibility against.
         :return: True if the team can cover umpiring, False if not
         """
+        if self.lazy_resolution:
+            self.resolve_travel_times_for_date(match.start_time.date())
 
         """
         The team cannot be playing in the match it is supposed to umpire. This is checked by ensuring that the 
         team's name does not match either the home or away team involved in the match. If the team is playing in the 
         match, it is deemed ineligible for umpiring."""
         if team in [match.home, match.away]:
-            logger.debug(
-                f"Not eligible - team {team} is playing in fixture with {match.home} v {match.away}"
-            )
+            if self.log_rejections:
+                self.record_rejection(team, match, "is playing in fixture")
             return False
 
         """
-        The team cannot be playing in another match that overlaps with the given match. The method iterates 
-        through other matches to check if the team is playing in any of them. If the team is found to 
-        be playing in another match that overlaps in time with the given match, 
-        it cannot umpire the given match due to the time conflict."""
-        for other_match in self.matches:
-            if team in [other_match.home, other_match.away] and match.overlaps_with(
-                other_match
-            ):
-                return False
-
-        """
-        The team must have enough travel time between the end of any match they are playing and the start of the 
-        match they are to umpire. For each match the team is playing that does not overlap with the given match, 
-        the method calculates the travel time from the location of that match to the location of the match to be 
-        umpired. If there isn't enough time for the team to travel between venues (the travel time is greater than 
-        the time difference between matches), the team is considered ineligible to umpire."""
-        for other_match in self.matches:
-            if team in [other_match.home, other_match.away]:
-                # Extract coordinates for both matches
-                origin_coords = self.extract_location_coordinates(
-                    [other_match.location]
-                )[0]
-                destination_coords = self.extract_location_coordinates(
-                    [match.location]
-                )[0]
-
-                travel_time_minutes = self.get_travel_time(
-                    origin_coords, destination_coords
-                )
-
-                # Calculate the time difference between the matches in both directions
-                buffer_after = (
-                    match.start_time - other_match.end_time
-                ).total_seconds() / 60 - travel_time_minutes
-                buffer_before = (
-                    other_match.start_time - match.end_time
-                ).total_seconds() / 60 - travel_time_minutes
-
-                if buffer_after < 0 and buffer_before < 0:
-                    return False
+        The team cannot be playing in another match that overlaps with the given match, and must have enough travel 
+        time between the end of any match they are playing and the start of the match they are to umpire (and vice 
+        versa). Both conditions are answered by the team availability calendar: every game the team plays that day 
+        is a busy interval, widened by the travel time from that game's venue to the venue of the match to be 
+        umpired. If the match falls inside any of those busy intervals, the team is considered ineligible to umpire. 
+        Games on other days can never conflict, so they are never looked at."""
+        if self.availability.is_available(team, match):
+            return True
+        if self.log_rejections:
+            self.record_rejection(team, match, "can't make it in time for fixture")
+        return False
+
+    def record_rejection(self, team: str, match: Fixture, reason: str) -> None:
+        """
+        Logs why a team isn't eligible to cover a match, only called when DEBUG logging is enabled. With a rejection
+        buffer configured, the reasons are kept in memory and written to the log in one go at the end of the run
+        instead of one record at a time.
+        :param team: Name of the team that isn't eligible
+        :param match: Fixture object the team can't cover
+        :param reason: Why the team isn't eligible
+        """
+        if self.rejections is not None:
+            self.rejections.append((team, reason, match))
+            return
+        logger.debug(
+            "Not eligible - team %s %s %s v %s",
+            team,
+            reason,
+            match.home,
+            match.away,
+        )
 
-        return True
+    def flush_rejections(self) -> None:
+        """
+        Writes the buffered rejection reasons to the log as a single record, and empties the buffer
+        """
+        if not self.rejections:
+            return
+        logger.debug(
+            "Not eligible - last %d rejection(s) of the run:\n%s",
+            len(self.rejections),
+            "\n".join(
+                f"team {team} {reason} {match.home} v {match.away} at {match.start_time}"
+                for team, reason, match in self.rejections
+            ),
+        )
+        self.rejections.clear()
 
     def get_travel_time(self, origin: tuple, destination: tuple) -> int:
         origin_str = ",".join([str(x) for x in origin])
@@ -308,6 +802,7 @@ class BuzzBot:
         return sum(self.umpiring_count.values())
 
 
-utils.print_ascii_header()
-print(f'TheBuzzBot says, "{utils.get_opening_tagline()}"\n')
-# utils.get_opening_tagline_with_cowsay()
+def print_welcome() -> None:
+    utils.print_ascii_header()
+    print(f'TheBuzzBot says, "{utils.get_opening_tagline()}"\n')
+    # utils.get_opening_tagline_with_cowsay()
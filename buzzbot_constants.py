@@ -1,6 +1,4 @@
-import yaml
-
-from heuristics import SelectionFunction, GreedyFair
+from heuristics import SelectionFunction, GreedyFair, AnytimeFair
 
 
 class BuzzBotConfiguration:
@@ -20,35 +18,67 @@ class BuzzBotConfiguration:
             return
         self.__initialized = True
         self.config_file = config_file
-        self.load()
-        self.validate_file()
+        self._settings = None
+
+    @property
+    def settings(self) -> dict:
+        """
+        The configuration, read from the config file and validated the first time it is used, so importing a module
+        that depends on it costs nothing until the configuration is actually needed.
+        """
+        if self._settings is None:
+            self.load()
+        return self._settings
+
+    @settings.setter
+    def settings(self, settings: dict):
+        self._settings = settings
 
     def load(self):
+        """
+        (Re)reads and validates the config file. Entry points call this up front so a broken config fails fast.
+        """
+        import yaml
+
         try:
             with open(self.config_file, "r") as file:
-                self.settings = yaml.safe_load(file) or {}
+                settings = yaml.safe_load(file) or {}
         except FileNotFoundError:
             # TODO - make these the default settings, not an empty dictionary.
             print(f"[-] {self.config_file} not found, using default settings.")
-            self.settings = {}
+            settings = {}
+        self.validate_file(settings)
+        self._settings = settings
 
-    def validate_file(self):
+    def validate_file(self, settings: dict):
         if (
-            self.settings["distance_matrix_ai"]["api_key"] is None
-            or len(self.settings["distance_matrix_ai"]["api_key"]) < 20
+            settings["distance_matrix_ai"]["api_key"] is None
+            or len(settings["distance_matrix_ai"]["api_key"]) < 20
         ):
             raise ValueError(
-                f"DistanceMatrix API not recognised as correct format. Got {self.settings['distance_matrix_ai']['api_key']} "
+                f"DistanceMatrix API not recognised as correct format. Got {settings['distance_matrix_ai']['api_key']} "
             )
 
     def save(self):
+        import yaml
+
         with open(self.config_file, "w") as file:
             yaml.safe_dump(self.settings, file)
 
 
-# Singleton instantiation
+# Singleton instantiation. Nothing is read until the settings are first used.
 buzzbotConfiguration = BuzzBotConfiguration()
 
 
 def get_selection_criteria() -> SelectionFunction:
-    return GreedyFair()
+    selection_settings = buzzbotConfiguration.settings.get("selection", {})
+    function = selection_settings.get("function", "GreedyFair")
+    if function == "GreedyFair":
+        return GreedyFair()
+    if function == "AnytimeFair":
+        return AnytimeFair(
+            time_budget_seconds=selection_settings.get("time_budget_seconds", 1.0)
+        )
+    raise ValueError(
+        f"Unknown selection function '{function}'. Expected GreedyFair or AnytimeFair."
+    )
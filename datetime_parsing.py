@@ -0,0 +1,105 @@
+from datetime import datetime
+
+from dateutil import parser
+
+# Formats tried, in order of preference, when detecting the format of a column. Day first, the way the sheet is
+# written, so a column of ambiguous dates like 02/03/2024 is read as the 2nd of March.
+DATE_FORMATS = [
+    "%d/%m/%Y",
+    "%d/%m/%y",
+    "%Y-%m-%d",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%m/%d/%Y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%A, %d %B %Y",
+    "%A %d %B %Y",
+]
+TIME_FORMATS = [
+    "%H:%M",
+    "%H:%M:%S",
+    "%I:%M %p",
+    "%I:%M:%S %p",
+    "%I:%M%p",
+    "%I%p",
+    "%H.%M",
+]
+DETECTION_SAMPLE_SIZE = 50
+
+
+def detect_format(values: [str], formats: [str]) -> str:
+    """
+    Finds the format that parses the most of the first values of a column, so every row can then be parsed with
+    strptime alone.
+
+    :param values: The values of the column
+    :param formats: strptime formats to choose from, in order of preference
+    :return: The best format, or None if none of them parses any of the values
+    """
+    sample = [value for value in values if value][:DETECTION_SAMPLE_SIZE]
+    best_format, best_count = None, 0
+    for candidate in formats:
+        count = 0
+        for value in sample:
+            try:
+                datetime.strptime(value, candidate)
+                count += 1
+            except ValueError:
+                pass
+        if count > best_count:
+            best_format, best_count = candidate, count
+            if count == len(sample):
+                break
+    return best_format
+
+
+class CachedFormatParser:
+    """
+    Parses values one at a time, for streams of rows too long to look at all at once. Every value is parsed with the
+    column's format first, so a stream in one format costs one strptime per distinct value. Only a value that doesn't
+    fit it is tried against the other formats, then dateutil, and the column's format is still tried first for the
+    values after it, so one odd value can't change how the rest of the column is read. Repeated values are remembered,
+    up to cache_size of them at a time.
+    """
+
+    def __init__(
+        self, formats: [str], column_format: str = None, cache_size: int = 4096
+    ):
+        """
+        :param formats: strptime formats the values may be in, in order of preference
+        :param column_format: Format tried first for every value, e.g. the one detected by detect_format
+        :param cache_size: Maximum number of parsed values remembered
+        """
+        self.formats: [str] = formats
+        self.column_format: str = column_format or formats[0]
+        self.cache_size: int = cache_size
+        self.cache: dict = {}
+
+    def parse(self, value: str) -> datetime:
+        """
+        :param value: The value to parse
+        :return: The parsed datetime, or None if the value couldn't be parsed
+        """
+        if value in self.cache:
+            return self.cache[value]
+        parsed = self.parse_uncached(value)
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[value] = parsed
+        return parsed
+
+    def parse_uncached(self, value: str) -> datetime:
+        try:
+            return datetime.strptime(value, self.column_format)
+        except (ValueError, TypeError):
+            pass
+        for candidate in self.formats:
+            try:
+                return datetime.strptime(value, candidate)
+            except (ValueError, TypeError):
+                continue
+        try:
+            return parser.parse(value)
+        except (ValueError, TypeError, OverflowError):
+            return None
@@ -0,0 +1,188 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from DistanceMatrixAPI import haversine_km
+
+
+class DistanceMatrixStubServer:
+    """
+    A local HTTP server that fakes the distancematrix.ai endpoint, so the travel time fetcher can be tested and
+    benchmarked offline. Travel times are the great-circle distance between each origin and destination driven at a
+    constant speed. The server can also be made slow and flaky to exercise the rate limiting and retry logic.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        speed_kmh: float = 60.0,
+        latency_seconds: float = 0.0,
+        failure_rate: float = 0.0,
+    ):
+        """
+        :param host: Interface to listen on
+        :param port: Port to listen on, 0 picks a free port
+        :param speed_kmh: Constant driving speed used to turn distances into travel times
+        :param latency_seconds: Delay added to every response
+        :param failure_rate: Fraction of requests that are answered with a 503 instead of a result
+        """
+        self.speed_kmh: float = speed_kmh
+        self.latency_seconds: float = latency_seconds
+        self.failure_rate: float = failure_rate
+        self.number_of_requests: int = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self.build_handler())
+        self.thread: threading.Thread = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/maps/api/distancematrix/json?"
+
+    def build_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.number_of_requests += 1
+                if server.latency_seconds:
+                    time.sleep(server.latency_seconds)
+                if random.random() < server.failure_rate:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                try:
+                    body = server.build_response(parse_qs(urlparse(self.path).query))
+                    status = 200
+                except (KeyError, ValueError):
+                    body = {"status": "INVALID_REQUEST", "rows": []}
+                    status = 400
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def build_response(self, query: dict) -> dict:
+        """
+        Builds a distancematrix.ai style response body for the origins and destinations of a request
+        """
+        origins = [parse_coordinates(o) for o in query["origins"][0].split("|")]
+        destinations = [
+            parse_coordinates(d) for d in query["destinations"][0].split("|")
+        ]
+        rows = []
+        for origin in origins:
+            elements = []
+            for destination in destinations:
+                distance_km = haversine_km(origin, destination)
+                elements.append(
+                    {
+                        "status": "OK",
+                        "distance": {"value": int(distance_km * 1000)},
+                        "duration": {"value": int(distance_km / self.speed_kmh * 3600)},
+                    }
+                )
+            rows.append({"elements": elements})
+        return {"status": "OK", "rows": rows}
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_coordinates(value: str) -> (float, float):
+    lat, long = value.split(",")
+    return float(lat), float(long)
+
+
+def benchmark(number_of_locations: int, **interface_kwargs) -> dict:
+    """
+    Times a cold travel time table build for randomly placed locations against the stub server.
+
+    :param number_of_locations: Number of locations to build the table for
+    :param interface_kwargs: Keyword arguments passed on to DistanceMatrixInterface
+    :return: Dictionary with the number of pairs, requests made and seconds taken
+    """
+    from DistanceMatrixAPI import DistanceMatrixInterface
+
+    locations = {
+        f"Location {i}": (random.uniform(55.5, 56.5), random.uniform(-4.5, -2.5))
+        for i in range(number_of_locations)
+    }
+    with DistanceMatrixStubServer(latency_seconds=0.05) as server:
+        api = DistanceMatrixInterface(
+            "stub-api-key-stub-api-key",
+            endpoint_=server.endpoint,
+            cache_backend_="memory",
+            **interface_kwargs,
+        )
+        api.import_from_LocationManager(locations)
+        start = time.time()
+        table = api.get_travel_time_table()
+        elapsed = time.time() - start
+    return {
+        "pairs": len(table),
+        "requests": api.number_of_requests,
+        "seconds": elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fake distancematrix.ai endpoint for offline testing"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=60.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        metavar="LOCATIONS",
+        help="Benchmark a cold travel time table build for this many locations instead of serving",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for batch_requests in (False, True):
+            print(
+                f"batch_requests={batch_requests}: {benchmark(args.benchmark, batch_requests_=batch_requests, requests_per_second_=0)}"
+            )
+    else:
+        stub = DistanceMatrixStubServer(
+            port=args.port,
+            speed_kmh=args.speed,
+            latency_seconds=args.latency,
+            failure_rate=args.failure_rate,
+        )
+        print(f"Serving fake distance matrix API at {stub.endpoint}")
+        try:
+            stub.httpd.serve_forever()
+        except KeyboardInterrupt:
+            stub.httpd.server_close()
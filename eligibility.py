@@ -0,0 +1,130 @@
+import numpy as np
+
+from availability import TeamAvailabilityCalendar
+from models import Fixture, FixtureTable, from_epoch_minutes
+
+ENGINES = ("calendar", "matrix")
+
+
+def compute_eligibility_matrix(
+    day_matches: [Fixture], teams: [str], location_ids: dict, travel_time_matrix
+) -> np.ndarray:
+    """
+    Computes whether every team can cover every fixture of a match day in one vectorised pass.
+
+    A team playing fixture f can't cover fixture g if g starts before f ends plus the travel time from f's venue to
+    g's, and f starts before g ends plus the same travel time. Checking every (f, g) pair at once gives a fixtures x
+    fixtures conflict matrix, and a team is blocked from covering g if it plays in any fixture that conflicts with g.
+    Every fixture conflicts with itself, which covers teams playing in the fixture they'd be covering.
+
+    :param day_matches: List of all the Fixture objects played on the match day
+    :param teams: List of the names of the teams that can cover
+    :param location_ids: Dictionary of location names and the integer IDs of their sites
+    :param travel_time_matrix: Square NumPy array of travel times in minutes, indexed by site ID
+    :return: Boolean array with a row per fixture and a column per team, True where the team can cover the fixture
+    """
+    return compute_table_eligibility_matrix(
+        FixtureTable(day_matches, teams, location_ids), travel_time_matrix
+    )
+
+
+def compute_table_eligibility_matrix(
+    table: FixtureTable, travel_time_matrix, rows: np.ndarray = None
+) -> np.ndarray:
+    """
+    Computes whether every uni team can cover every fixture of a match day, straight from the columns of a
+    FixtureTable. See compute_eligibility_matrix.
+
+    :param table: FixtureTable holding the match day, built with the location IDs of the travel time matrix
+    :param travel_time_matrix: Square NumPy array of travel times in minutes, indexed by location ID
+    :param rows: Rows of the table played on the match day. Defaults to every row
+    :return: Boolean array with a row per fixture and a column per uni team, True where the team can cover the fixture
+    """
+    if rows is None:
+        rows = np.arange(len(table))
+    starts = table.start_minutes[rows]
+    ends = table.end_minutes[rows]
+    locations = table.location_matrix_ids[table.location_id_column[rows]]
+
+    plays = np.zeros((table.number_of_teams, len(rows)), dtype=bool)
+    columns = np.arange(len(rows))
+    for team_ids in (table.home_ids[rows], table.away_ids[rows]):
+        uni_team = team_ids < table.number_of_teams
+        plays[team_ids[uni_team], columns[uni_team]] = True
+
+    travel = travel_time_matrix[locations[:, None], locations[None, :]]
+    if np.isnan(travel[plays.any(axis=0)]).any():
+        raise ValueError(
+            "Travel time not found between some of the locations played at on "
+            f"{from_epoch_minutes(starts[0]).date()}."
+        )
+
+    conflicts = (starts[:, None] - travel < ends[None, :]) & (
+        ends[:, None] + travel > starts[None, :]
+    )
+    blocked = (plays.astype(np.int32) @ conflicts.astype(np.int32)) > 0
+    return ~blocked.T
+
+
+def eligible_teams_from_row(row: np.ndarray, teams: [str]) -> [str]:
+    return sorted(teams[i] for i in np.flatnonzero(row))
+
+
+# Read-only state shared by every eligibility worker process, set once per process by init_eligibility_worker so the
+# travel time matrix isn't pickled with every task.
+_worker_state: dict = {}
+
+
+def init_eligibility_worker(teams: [str], location_ids: dict, travel_time_matrix):
+    _worker_state["teams"] = teams
+    _worker_state["location_ids"] = location_ids
+    _worker_state["travel_time_matrix"] = travel_time_matrix
+
+
+def compute_day_eligibility_table(table: FixtureTable) -> np.ndarray:
+    """
+    Computes the eligibility matrix of one match day held in a FixtureTable, which is much cheaper to send to a worker
+    process than Fixture objects. Runs in a worker process, see init_eligibility_worker.
+
+    :param table: FixtureTable of the fixtures played on the match day
+    :return: Boolean array with a row per fixture and a column per uni team, True where the team can cover the fixture
+    """
+    return compute_table_eligibility_matrix(table, _worker_state["travel_time_matrix"])
+
+
+def compute_day_eligibility(day_matches: [Fixture]) -> [[str]]:
+    """
+    Computes the eligible covering teams for every fixture on one match day with the 'calendar' engine. Runs in a
+    worker process, see init_eligibility_worker.
+
+    :param day_matches: List of all the Fixture objects played on the match day
+    :return: List with the sorted eligible teams for each fixture, in the same order as day_matches. Fixtures that
+    don't need umpires get an empty list.
+    """
+    teams = _worker_state["teams"]
+    fixtures_by_team_and_date = {}
+    for match in sorted(day_matches, key=lambda x: x.start_time):
+        for team in {match.home, match.away}:
+            fixtures_by_team_and_date.setdefault(
+                (team, match.start_time.date()), []
+            ).append(match)
+    calendar = TeamAvailabilityCalendar(
+        fixtures_by_team_and_date,
+        _worker_state["location_ids"],
+        _worker_state["travel_time_matrix"],
+    )
+
+    eligibility = []
+    for match in day_matches:
+        if match.umpires_required == 0:
+            eligibility.append([])
+            continue
+        eligibility.append(
+            sorted(
+                team
+                for team in teams
+                if team not in (match.home, match.away)
+                and calendar.is_available(team, match)
+            )
+        )
+    return eligibility
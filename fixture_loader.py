@@ -0,0 +1,200 @@
+import csv
+import itertools
+from datetime import datetime
+
+from datetime_parsing import (
+    DATE_FORMATS,
+    DETECTION_SAMPLE_SIZE,
+    TIME_FORMATS,
+    CachedFormatParser,
+    detect_format,
+)
+from models import Fixture
+
+CSV_HEADERS = ["uni_team", "opposition", "start_time", "umpires_needed", "location"]
+CSV_START_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class FixtureLoader:
+    """
+    Reads fixtures from a CSV file or the rows of the fixtures worksheet in a single pass. Every row is validated and
+    parsed once, valid rows are yielded as Fixtures as soon as they are read, and the problems with invalid rows are
+    collected in errors, so one run reports everything wrong with the input. Only one row is held at a time (plus a
+    small sample for detecting the worksheet's date and time formats), so exports of any size can be read.
+
+    The iterators must be run to the end before errors is complete, e.g.
+
+        loader = FixtureLoader(teams, location_index)
+        fixtures = list(loader.iter_csv("input.csv"))
+        if loader.errors:
+            raise ExceptionWithList(loader.errors)
+    """
+
+    def __init__(self, teams: [str] = None, location_index=None):
+        """
+        :param teams: The uni teams. If given, rows for any other team are errors
+        :param location_index: LocationNameIndex of the known locations. If given, locations are resolved to known
+        location names (venue names on their own are kept as written) and rows with unknown locations are errors
+        """
+        self.teams: set = set(teams) if teams is not None else None
+        self.location_index = location_index
+        self.errors: [str] = []
+        self.rows_read: int = 0
+
+    def iter_csv(self, file_path: str):
+        """
+        Streams the fixtures of a CSV file with the columns uni_team, opposition, start_time, umpires_needed and
+        location, and start times written as 'YYYY-MM-DD HH:MM:SS'
+        :param file_path: Path of the CSV file
+        :return: Generator of the Fixtures of the valid rows
+        """
+        with open(file_path, mode="r", encoding="utf-8", newline="") as csvfile:
+            reader = csv.reader(csvfile)
+            headers = next(reader, [])
+            if headers != CSV_HEADERS:
+                self.errors.append(
+                    f"Your column names in your input file are incorrect. The program got {headers} from you "
+                    f"but expect {CSV_HEADERS}. Please go into the file and change the column names."
+                )
+
+            # Starting from 2 because header is row 1
+            for row_number, raw_row in enumerate(reader, start=2):
+                self.rows_read += 1
+                row = [value.strip() for value in raw_row]
+                if len(row) != len(CSV_HEADERS):
+                    self.errors.append(
+                        f"Row {row_number} - {raw_row} - has incorrect number of columns. Got {len(row)} columns "
+                        f"from you in that row but expected {len(CSV_HEADERS)}"
+                    )
+                    continue
+                home, away, start_time_value, umpires_value, location_value = row
+
+                try:
+                    start_time = datetime.strptime(
+                        start_time_value, CSV_START_TIME_FORMAT
+                    )
+                except ValueError:
+                    start_time = None
+                    self.errors.append(
+                        f"Row {row_number} - {raw_row} - start_time value is not of the correct format. It is "
+                        f"{start_time_value} and it should be of the format 'YYYY-MM-DD HH:MM:SS'"
+                    )
+
+                fixture = self.build_fixture(
+                    row_number,
+                    raw_row,
+                    home,
+                    away,
+                    start_time,
+                    umpires_value,
+                    location_value,
+                )
+                if fixture is not None:
+                    yield fixture
+
+    def iter_records(self, records):
+        """
+        Streams the fixtures of the rows of the fixtures worksheet, which have the columns uni_team, opposition, date,
+        pushback_time, umpires_needed and location. The date and time formats are detected from the first rows, and
+        rows in other formats are still read.
+        :param records: Iterable of the rows of the worksheet, keyed by column name
+        :return: Generator of the Fixtures of the valid rows
+        """
+        records = iter(records)
+        sample = list(itertools.islice(records, DETECTION_SAMPLE_SIZE))
+        date_parser = CachedFormatParser(
+            DATE_FORMATS,
+            detect_format([str(row["date"]).strip() for row in sample], DATE_FORMATS),
+        )
+        time_parser = CachedFormatParser(
+            TIME_FORMATS,
+            detect_format(
+                [str(row["pushback_time"]).strip() for row in sample], TIME_FORMATS
+            ),
+        )
+
+        # Starting from 2 because header is row 1
+        for row_number, record in enumerate(itertools.chain(sample, records), start=2):
+            self.rows_read += 1
+            raw_row = list(record.values())
+            date_value = str(record["date"]).strip()
+            time_value = str(record["pushback_time"]).strip()
+            date = date_parser.parse(date_value)
+            pushback_time = time_parser.parse(time_value)
+            if date is None or pushback_time is None:
+                start_time = None
+                self.errors.append(
+                    f"Row {row_number} - could not read the date '{date_value}' and time '{time_value}' of the "
+                    f"fixture."
+                )
+            else:
+                start_time = datetime.combine(date.date(), pushback_time.time())
+
+            fixture = self.build_fixture(
+                row_number,
+                raw_row,
+                str(record["uni_team"]).strip(),
+                str(record["opposition"]).strip(),
+                start_time,
+                str(record["umpires_needed"]).strip(),
+                str(record["location"]).strip(),
+            )
+            if fixture is not None:
+                yield fixture
+
+    def build_fixture(
+        self,
+        row_number: int,
+        raw_row: list,
+        home: str,
+        away: str,
+        start_time: datetime,
+        umpires_value: str,
+        location_value: str,
+    ) -> Fixture:
+        """
+        Checks the rest of a row and builds its Fixture
+        :param row_number: Row number in the file or worksheet, for error messages
+        :param raw_row: The row as it was read, for error messages
+        :param start_time: The row's start time, or None if it couldn't be read (already reported)
+        :return: The Fixture, or None if anything in the row is invalid
+        """
+        valid = start_time is not None
+
+        if self.teams is not None and home not in self.teams:
+            valid = False
+            self.errors.append(
+                f"Row {row_number} - {raw_row} - the first column which is meant to represent the uni team "
+                f"is not an actual uni team ({home}). It should be one of {', '.join(sorted(self.teams))}"
+            )
+
+        umpires_needed = None
+        if not umpires_value.isdigit():
+            self.errors.append(
+                f"Row {row_number} - {raw_row} - the umpires_needed value is not a number. It is instead "
+                f"{umpires_value}"
+            )
+        elif not 0 <= int(umpires_value) <= 2:
+            self.errors.append(
+                f"Row {row_number} - {raw_row} - has an invalid number of umpires. It should either be 0, 1, "
+                f"or 2. It is currently {umpires_value}"
+            )
+        else:
+            umpires_needed = int(umpires_value)
+        valid = valid and umpires_needed is not None
+
+        location = location_value
+        if self.location_index is not None:
+            location = self.location_index.resolve(location_value)
+            if location is None:
+                valid = False
+                suggestions = "' or '".join(self.location_index.suggest(location_value))
+                self.errors.append(
+                    f"Row {row_number} - {raw_row} - has an invalid match location. Have you spelt the name "
+                    f"'{location_value}' correctly? Did you possibly mean '{suggestions}' instead? Please refer "
+                    f"to the location table for the correct location names."
+                )
+
+        if not valid:
+            return None
+        return Fixture(home, away, start_time, umpires_needed, location)
@@ -1,11 +1,16 @@
 import gspread
 from google.oauth2.service_account import Credentials
 import pandas as pd
-from models import Fixture
-from datetime import datetime, time
+from buzzbot_constants import buzzbotConfiguration
+from instrumentation import run_report
+from sheet_layout import HEADERS, build_assignments_grid, column_letter, diff_grids
 import logging
 from tqdm import tqdm
-from dateutil import parser
+from utils import ExceptionWithList
+from fixture_loader import FixtureLoader
+from location_index import LocationNameIndex
+from gspread.urls import DRIVE_FILES_API_V3_URL
+from gspread.utils import fill_gaps, numericise_all, to_records
 
 # NOTE: the file/class needs a lot of logging because I want to know what is happening.
 logging.basicConfig(
@@ -22,10 +27,11 @@ class GoogleSheetManager:
         logging.info("Initializing GoogleSheetManager...")
         self.credentials_file = credentials_file
         self.sheet_name = sheet_name
-        logging.info("Attempting to authenticate...")
-        self.client = self._authenticate()
-        logging.info("Opening Google Sheet: %s", self.sheet_name)
-        self.sheet = self.client.open(sheet_name)
+        with run_report.span("sheets.connect"):
+            logging.info("Attempting to authenticate...")
+            self.client = self._authenticate()
+            logging.info("Opening Google Sheet: %s", self.sheet_name)
+            self.sheet = self.client.open(sheet_name)
         logging.info("Google Sheet opened successfully.")
 
     def _authenticate(self):
@@ -53,6 +59,22 @@ class GoogleSheetManager:
         logging.info("Authentication successful.")
         return client
 
+    def get_revision(self):
+        """
+        Returns the Drive version of the spreadsheet, which changes whenever anything in it is edited. Much cheaper than
+        reading any worksheet, so it can be polled to find out when the spreadsheet needs reading again.
+
+        Returns:
+            str: The version of the spreadsheet.
+        """
+        response = self.client.http_client.request(
+            "get",
+            f"{DRIVE_FILES_API_V3_URL}/{self.sheet.id}",
+            params={"fields": "version", "supportsAllDrives": True},
+        )
+        run_report.increment("sheets.requests")
+        return response.json()["version"]
+
     def get_worksheet(self, worksheet_name):
         """
         Returns a worksheet
@@ -69,110 +91,49 @@ class GoogleSheetManager:
         logging.info("Worksheet %s retrieved successfully.", worksheet_name)
         return worksheet
 
-    def write_assignments(self, worksheet_name, fixtures):
-        # TODO: This method is extraordinarily long and probably needs broken up.
-        # NOTE: You could probably write a new class called SheetWriter that just contains all of the functions for writing to the sheet.
+    def write_assignments(self, worksheet_name, fixtures, write_mode="full"):
         """
-        Writes fixture assignments to the specified worksheet in the required structure using a pandas DataFrame. This is a really complex function that is hardcoded to manipulate a Pandas DataFrame precisely so that it can be written to the target Google Sheet.
+        Writes fixture assignments to the specified worksheet in the traditional 'fixtures umpiring combo doc' layout,
+        built by sheet_layout.build_assignments_grid.
 
         Parameters:
             worksheet_name (str): The name of the worksheet to write data to.
             fixtures (List[Fixture]): A list of Fixture objects with covering_team assignments to be written to the sheet.
+            write_mode (str): 'full' uploads the whole grid. 'diff' reads the cells the grid covers once and only
+                uploads the ranges that changed, in a single batch update, leaving unchanged cells untouched.
         """
+        if write_mode not in ("full", "diff"):
+            raise ValueError(
+                f"Unknown write mode '{write_mode}'. Expected one of ['full', 'diff']."
+            )
         logging.info("Preparing to write assignments to worksheet: %s", worksheet_name)
         worksheet = self.get_worksheet(worksheet_name)
 
-        teams = sorted({fixture.home for fixture in fixtures})
-        logging.info("Identified teams: %s", teams)
-
-        df = pd.DataFrame(columns=["Day", "Date"] + teams)
-
-        current_date = None
-        row_data = {}
-
-        for fixture in tqdm(fixtures, desc="Preparing Assignments", unit="fixture"):
-            fixture_date = fixture.start_time.strftime("%d/%m/%Y")
-            fixture_day = fixture.start_time.strftime("%A")
-
-            if fixture.start_time.date() != current_date:
-                # If there's a current row being processed, append it to the DataFrame
-                if row_data:
-                    # Append the row with the fixture info
-                    df = pd.concat([df, pd.DataFrame([row_data])], ignore_index=True)
-                    # Append the row with the covering team info directly below the fixture info
-                    covering_row = {key: "" for key in df.columns}
-                    covering_row["Date"] = "Buzzbot cover recommendation"
-                    for team in teams:
-                        if team in row_data:
-                            covering_row[team] = (
-                                f"{row_data[team + '_cover']} cover"
-                                f"\n({row_data[team + '_umpires_required']}x required)"
-                            )
-                    df = pd.concat(
-                        [df, pd.DataFrame([covering_row])], ignore_index=True
-                    )
-                    # Append the row with the eligible teams info directly below the covering team info
-                    eligible_row = {key: "" for key in df.columns}
-                    eligible_row["Date"] = "All eligible covering teams"
-                    for team in teams:
-                        if team in row_data:
-                            eligible_row[team] = ", ".join(
-                                row_data.get(team + "_eligible", [])
-                            )
-                    df = pd.concat(
-                        [df, pd.DataFrame([eligible_row])], ignore_index=True
-                    )
-                    # Add two blank rows after the eligible teams row
-                    df = pd.concat(
-                        [df, pd.DataFrame([{}]), pd.DataFrame([{}])], ignore_index=True
-                    )
-
-                # Start a new row for a new date
-                current_date = fixture.start_time.date()
-                row_data = {"Day": fixture_day, "Date": fixture_date}
-
-            fixture_info = f"{fixture.away} {fixture.start_time.strftime('%H:%M')} PB @ {fixture.location}"
-
-            row_data[fixture.home] = fixture_info
-            row_data[fixture.home + "_cover"] = fixture.covering_team
-            row_data[fixture.home + "_eligible"] = fixture.eligible_teams
-            row_data[fixture.home + "_umpires_required"] = fixture.umpires_required
-
-        # Append the last processed row
-        if row_data:
-            df = pd.concat([df, pd.DataFrame([row_data])], ignore_index=True)
-            covering_row = {key: "" for key in df.columns}
-            covering_row["Date"] = "Buzzbot cover recommendation"
-            for team in teams:
-                if team in row_data:
-                    covering_row[team] = (
-                        f"{row_data[team + '_cover']} cover"
-                        f"\n({row_data[team + '_umpires_required']}x required)"
-                    )
-            df = pd.concat([df, pd.DataFrame([covering_row])], ignore_index=True)
-
-            eligible_row = {key: "" for key in df.columns}
-            eligible_row["Date"] = "All eligible covering teams"
-            for team in teams:
-                if team in row_data:
-                    eligible_row[team] = ", ".join(row_data.get(team + "_eligible", []))
-            df = pd.concat([df, pd.DataFrame([eligible_row])], ignore_index=True)
-            # Add two blank rows after the last eligible teams row
-            df = pd.concat(
-                [df, pd.DataFrame([{}]), pd.DataFrame([{}])], ignore_index=True
-            )
-
-        # HACK: Remove any columns that contain "cover" or "eligible" in the name
-        df = df.drop(
-            columns=[
-                col
-                for col in df.columns
-                if "cover" in col or "eligible" in col or "umpire" in col
-            ]
-        )
+        grid = build_assignments_grid(fixtures)
+        logging.info("Identified teams: %s", grid[0][len(HEADERS) :])
 
-        logging.info("Writing DataFrame to worksheet: %s", worksheet_name)
-        worksheet.update([df.columns.values.tolist()] + df.fillna("").values.tolist())
+        if write_mode == "full":
+            logging.info("Writing %d rows to worksheet: %s", len(grid), worksheet_name)
+            worksheet.update(grid)
+            run_report.increment("sheets.requests")
+            run_report.increment("sheets.cells_written", len(grid) * len(grid[0]))
+        else:
+            current = worksheet.get_values(
+                f"A1:{column_letter(len(grid[0]))}{len(grid)}"
+            )
+            run_report.increment("sheets.requests")
+            updates = diff_grids(current, grid)
+            logging.info(
+                "Writing %d changed ranges to worksheet: %s",
+                len(updates),
+                worksheet_name,
+            )
+            if updates:
+                worksheet.batch_update(updates)
+                run_report.increment("sheets.requests")
+            run_report.increment(
+                "sheets.cells_written", sum(len(u["values"][0]) for u in updates)
+            )
         logging.info(
             "Assignments written successfully to worksheet: %s", worksheet_name
         )
@@ -201,41 +162,90 @@ class GoogleSheetManager:
         """
         logging.info("Reading fixture data from worksheet: %s", worksheet_name)
         worksheet = self.get_worksheet(worksheet_name)
-        data = worksheet.get_all_records()
+        fixtures = self.fixtures_from_records(worksheet.get_all_records())
+        logging.info("Fixtures read successfully from worksheet: %s", worksheet_name)
+        return fixtures
 
-        fixtures = []
-        for row in data:
-            start_time = self.combine_date_and_time(row["date"], row["pushback_time"])
-            fixture = Fixture(
-                home_=row["uni_team"],
-                away_=row["opposition"],
-                start_time_=start_time,
-                umpires_required_=int(row["umpires_needed"]),
-                location_=row["location"],
-            )
-            fixtures.append(fixture)
+    @staticmethod
+    def fixtures_from_records(records, teams=None, location_index=None):
+        """
+        Builds Fixture objects from the rows of the fixtures worksheet, validating and parsing each row once.
 
-        logging.info("Fixtures read successfully from worksheet: %s", worksheet_name)
+        Parameters:
+            records (Iterable[dict]): The rows of the worksheet, keyed by column name.
+            teams (List[str]): The uni teams. If given, rows for any other team are rejected.
+            location_index (LocationNameIndex): The known locations. If given, locations are resolved to known
+                location names, venue names on their own are kept as written, and rows with unknown locations are
+                rejected.
+
+        Returns:
+            List[Fixture]: A Fixture for every row.
+
+        Raises:
+            ExceptionWithList: If any row is invalid, listing every problem found.
+        """
+        loader = FixtureLoader(teams, location_index)
+        fixtures = list(loader.iter_records(records))
+        if loader.errors:
+            raise ExceptionWithList(loader.errors)
         return fixtures
 
-    def combine_date_and_time(self, date_str: str, time_str: str):
+    def read_records_batch(self, worksheet_names):
+        """
+        Reads every row of several worksheets in a single values batchGet request, instead of a worksheet metadata
+        request and a values request per worksheet.
+
+        Parameters:
+            worksheet_names (List[str]): The names of the worksheets to read.
+
+        Returns:
+            dict: The rows of each worksheet, as get_all_records would return them, keyed by worksheet name.
         """
-        Combines a date string and a time string into a single datetime object.
+        logging.info("Reading worksheets in one request: %s", worksheet_names)
+        response = self.sheet.values_batch_get(
+            ["'{}'".format(name.replace("'", "''")) for name in worksheet_names]
+        )
+        run_report.increment("sheets.requests")
+        records = {}
+        for name, value_range in zip(worksheet_names, response["valueRanges"]):
+            values = fill_gaps(value_range.get("values", []))
+            if not values:
+                records[name] = []
+                continue
+            records[name] = to_records(
+                values[0], [numericise_all(row) for row in values[1:]]
+            )
+        logging.info("Worksheets read successfully: %s", worksheet_names)
+        return records
+
+    def read_fixtures_and_locations(
+        self,
+        fixtures_worksheet="Fixtures List",
+        locations_worksheet="Locations",
+        teams=None,
+    ):
+        """
+        Reads the fixtures and locations worksheets in a single round trip. The locations of the fixtures are checked
+        against the locations worksheet.
 
         Parameters:
-            date_str (str): The date part as a string.
-            time_str (str): The time part as a string.
+            fixtures_worksheet (str): The name of the fixtures worksheet.
+            locations_worksheet (str): The name of the locations worksheet.
+            teams (List[str]): The uni teams. If given, fixtures for any other team are rejected.
 
         Returns:
-            datetime: A combined datetime object.
-        """
-        try:
-            parsed_date = parser.parse(date_str).date()
-            parsed_time = parser.parse(time_str).time()
-            return datetime.combine(parsed_date, parsed_time)
-        except (ValueError, TypeError) as e:
-            logging.error(f"Error parsing date or time: {e}")
-            return None
+            Tuple[List[Fixture], DataFrame]: The fixtures, and the location data as a pandas DataFrame.
+        """
+        records = self.read_records_batch([fixtures_worksheet, locations_worksheet])
+        location_index = LocationNameIndex.from_records(
+            records[locations_worksheet],
+            buzzbotConfiguration.settings.get("locations", {}).get("aliases"),
+        )
+        fixtures = self.fixtures_from_records(
+            records[fixtures_worksheet], teams, location_index
+        )
+        locations = pd.DataFrame(records[locations_worksheet])
+        return fixtures, locations
 
     def read_locations_sheet(self, worksheet_name="Locations") -> pd.DataFrame:
         """
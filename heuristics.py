@@ -1,3 +1,5 @@
+import random
+import time
 from abc import ABC, abstractmethod
 
 
@@ -11,10 +13,48 @@ class SelectionFunction(ABC):
         """
         Finds the most suited team for umpiring from the list of eligible teams
         :param eligible_teams: list of string of eligible teams that can umpire a given fixture
+        :param kwargs: umpiring_count - dictionary of the number of umpires each team has supplied so far,
+        availability - the TeamAvailabilityCalendar used to decide eligibility, for heuristics that want to look at
+        when teams are free
         :return: The best team to umpire
         """
         pass
 
+    def deadline(self):
+        """
+        Starts the clock on a run's selection, which may take several calls to assign, e.g. one per match day
+        :return: The time.monotonic() time by which every call to assign in the run has to finish, None if there is no
+        time limit
+        """
+        return None
+
+    def assign(
+        self,
+        eligibility: [[str]],
+        umpires_required: [int],
+        umpiring_count: dict,
+        **kwargs,
+    ) -> [str]:
+        """
+        Selects a covering team for each of a sequence of fixtures, in order, and adds the umpires they supply to
+        umpiring_count. By default every fixture is decided on its own with evaluate, one after the other.
+        :param eligibility: list with the eligible teams of each fixture
+        :param umpires_required: list with the number of umpires each fixture needs
+        :param umpiring_count: dictionary of the number of umpires each team has supplied so far, updated in place
+        :param kwargs: passed on to evaluate, and deadline - the time.monotonic() time returned by deadline for the
+        run, if the selection function has a time limit
+        :return: list with the selected team for each fixture, None where no team is eligible
+        """
+        selections = []
+        for eligible_teams, umpires in zip(eligibility, umpires_required):
+            if not eligible_teams:
+                selections.append(None)
+                continue
+            team = self.evaluate(eligible_teams, umpiring_count=umpiring_count, **kwargs)
+            umpiring_count[team] = umpiring_count.get(team, 0) + umpires
+            selections.append(team)
+        return selections
+
 
 class GreedyFair(SelectionFunction):
     def evaluate(self, eligible_teams: [str], **kwargs) -> str:
@@ -22,3 +62,106 @@ class GreedyFair(SelectionFunction):
         eligible_teams = sorted(eligible_teams, key=lambda x: (umpiring_count[x], x))
         best_selection = eligible_teams[0]
         return best_selection
+
+
+class AnytimeFair(GreedyFair):
+    """
+    Starts from the GreedyFair assignment of a whole match day or season and improves it by local search until it
+    reaches a local optimum or runs out of time, so it is never worse than GreedyFair. The time budget is for a whole
+    run, shared by all the match days it assigns.
+
+    An assignment is better if it is fairer, measured by the sum of the squared umpiring counts of the teams, and
+    between equally fair assignments, if it gives more of the umpiring to the stronger teams. The search moves a
+    fixture to another eligible team, or moves a fixture to another team and one of that team's fixtures on to a third
+    team, and only ever accepts a move that makes the assignment strictly better.
+    """
+
+    def __init__(self, time_budget_seconds: float = 1.0, seed: int = 0):
+        super().__init__()
+        self.time_budget_seconds: float = time_budget_seconds
+        self.seed: int = seed
+
+    def deadline(self) -> float:
+        return time.monotonic() + self.time_budget_seconds
+
+    def assign(
+        self,
+        eligibility: [[str]],
+        umpires_required: [int],
+        umpiring_count: dict,
+        **kwargs,
+    ) -> [str]:
+        deadline = kwargs.pop("deadline", None)
+        if deadline is None:
+            deadline = self.deadline()
+        selections = super().assign(
+            eligibility, umpires_required, umpiring_count, **kwargs
+        )
+
+        rank = {
+            team: i
+            for i, team in enumerate(
+                sorted({team for teams in eligibility for team in teams})
+            )
+        }
+        assigned = {}
+        for i, team in enumerate(selections):
+            if team is not None:
+                assigned.setdefault(team, set()).add(i)
+        movable = [
+            i
+            for i, teams in enumerate(eligibility)
+            if len(teams) > 1 and umpires_required[i] > 0
+        ]
+
+        def cost_of_change(changes: dict) -> (int, int):
+            fairness = sum(
+                (umpiring_count.get(team, 0) + change) ** 2
+                - umpiring_count.get(team, 0) ** 2
+                for team, change in changes.items()
+            )
+            strength = sum(rank[team] * change for team, change in changes.items())
+            return fairness, strength
+
+        def move(i: int, team: str) -> None:
+            umpires = umpires_required[i]
+            umpiring_count[selections[i]] -= umpires
+            assigned[selections[i]].discard(i)
+            umpiring_count[team] = umpiring_count.get(team, 0) + umpires
+            assigned.setdefault(team, set()).add(i)
+            selections[i] = team
+
+        rng = random.Random(self.seed)
+        improved = True
+        while improved and time.monotonic() < deadline:
+            improved = False
+            rng.shuffle(movable)
+            for i in movable:
+                if time.monotonic() >= deadline:
+                    break
+                current, umpires = selections[i], umpires_required[i]
+                best_moves, best_cost = None, (0, 0)
+                for team in eligibility[i]:
+                    if team == current:
+                        continue
+                    cost = cost_of_change({current: -umpires, team: umpires})
+                    if cost < best_cost:
+                        best_moves, best_cost = [(i, team)], cost
+                    for j in assigned.get(team, ()):
+                        if time.monotonic() >= deadline:
+                            break
+                        for third_team in eligibility[j]:
+                            if third_team == team or umpires_required[j] == 0:
+                                continue
+                            changes = {current: 0, team: 0, third_team: 0}
+                            changes[current] -= umpires
+                            changes[team] += umpires - umpires_required[j]
+                            changes[third_team] += umpires_required[j]
+                            cost = cost_of_change(changes)
+                            if cost < best_cost:
+                                best_moves, best_cost = [(i, team), (j, third_team)], cost
+                if best_moves:
+                    for fixture, team in best_moves:
+                        move(fixture, team)
+                    improved = True
+        return selections
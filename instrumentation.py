@@ -0,0 +1,121 @@
+import datetime
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class RunReport:
+    """
+    Collects where the time goes in a run: how long each phase took (spans), how often things happened (counters), and
+    the distribution of measurements such as API latencies (histograms). Spans nest, so a span opened inside another is
+    recorded under the path of both, e.g. 'compute/eligibility'. Spans with the same path are added together. Safe to
+    use from several threads at once.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clears everything recorded so far, to start a new run
+        """
+        with self.lock:
+            self.started_at: datetime.datetime = datetime.datetime.now()
+            self.start_time: float = time.perf_counter()
+            self.spans: dict = {}
+            self.counters: dict = {}
+            self.histograms: dict = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Times the block inside the with statement as a phase called name
+        """
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        stack.append(name)
+        path = "/".join(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            with self.lock:
+                span = self.spans.setdefault(path, {"count": 0, "seconds": 0.0})
+                span["count"] += 1
+                span["seconds"] += elapsed
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float, buckets: [float] = None) -> None:
+        """
+        Adds a measurement to a histogram
+        :param name: Name of the histogram
+        :param value: The measurement
+        :param buckets: Upper bounds of the histogram's buckets, used when the histogram is first created. Defaults to
+        LATENCY_BUCKETS_MS.
+        """
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                bounds = list(buckets or LATENCY_BUCKETS_MS)
+                histogram = self.histograms[name] = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "min": value,
+                    "max": value,
+                    "bounds": bounds,
+                    "buckets": [0] * (len(bounds) + 1),
+                }
+            histogram["count"] += 1
+            histogram["sum"] += value
+            histogram["min"] = min(histogram["min"], value)
+            histogram["max"] = max(histogram["max"], value)
+            for i, bound in enumerate(histogram["bounds"]):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+                    break
+            else:
+                histogram["buckets"][-1] += 1
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            histograms = {}
+            for name, histogram in self.histograms.items():
+                labels = [f"<={bound}" for bound in histogram["bounds"]] + [
+                    f">{histogram['bounds'][-1]}"
+                ]
+                histograms[name] = {
+                    "count": histogram["count"],
+                    "mean": histogram["sum"] / histogram["count"],
+                    "min": histogram["min"],
+                    "max": histogram["max"],
+                    "buckets": dict(zip(labels, histogram["buckets"])),
+                }
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "total_seconds": time.perf_counter() - self.start_time,
+                "spans": {path: dict(span) for path, span in self.spans.items()},
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": histograms,
+            }
+
+    def write(self, path: str) -> None:
+        """
+        Writes the report to a file as JSON
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# The report of the current run, shared by every component
+run_report = RunReport()
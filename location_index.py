@@ -0,0 +1,161 @@
+import csv
+import os
+import re
+from difflib import SequenceMatcher
+
+NGRAM_SIZE = 3
+# Number of n-gram candidates re-ranked with SequenceMatcher when suggesting names
+RERANK_CANDIDATES = 10
+
+
+def normalise_location_name(name: str) -> str:
+    """
+    Lower cases a location name, drops punctuation and collapses whitespace, so trivially different spellings of a
+    name compare equal
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", str(name).lower()).split())
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> set:
+    padded = f"  {text} "
+    return {padded[i : i + size] for i in range(len(padded) - size + 1)}
+
+
+def find_venues(locations: dict) -> dict:
+    """
+    Finds the venues of a set of locations: the leading words of the names of several locations, all at the same
+    coordinates, for example 'peffermill' for 'Peffermill A1' and 'Peffermill A2'
+    :param locations: Dictionary of known location names and their (latitude, longitude) coordinates
+    :return: Dictionary of normalised venue names and the names of the known locations at the venue
+    """
+    by_venue = {}
+    for name in locations:
+        tokens = normalise_location_name(name).split()
+        for j in range(1, len(tokens)):
+            by_venue.setdefault(" ".join(tokens[:j]), []).append(name)
+    return {
+        venue: names
+        for venue, names in by_venue.items()
+        if len(names) >= 2 and len({locations[name] for name in names}) == 1
+    }
+
+
+class LocationNameIndex:
+    """
+    Index of known location names, built once, for resolving the names written on fixtures to known locations and
+    suggesting corrections for misspelt ones.
+
+    A name resolves to a known location if it matches it exactly, once normalised, or through an alias. It also
+    resolves if it names a venue with several known locations, all at the same coordinates, for example 'Peffermill'
+    for 'Peffermill A1' and 'Peffermill A2', which are pitches at the same venue. A venue name is kept as written, as
+    no pitch was given, and LocationManager knows the venues too, so it can still be located. A leading word shared by
+    only one known location is not a venue, e.g. 'Edinburgh' doesn't resolve to 'Edinburgh Academy North Pitch'.
+    Suggestions are found from an inverted index of character trigrams, so only the names sharing trigrams with the
+    misspelling are looked at.
+    """
+
+    def __init__(self, locations: dict, aliases: dict = None):
+        """
+        :param locations: Dictionary of known location names and their (latitude, longitude) coordinates
+        :param aliases: Dictionary of other names and the known location names they stand for
+        """
+        self.names: [str] = list(locations)
+        self.coordinates: dict = dict(locations)
+        self.by_normalised_name: dict = {}
+        self.venues: dict = find_venues(locations)
+        self.postings: dict = {}
+        self.normalised_names: [str] = []
+        self.name_ngrams: [set] = []
+        for i, name in enumerate(self.names):
+            normalised = normalise_location_name(name)
+            self.normalised_names.append(normalised)
+            self.by_normalised_name.setdefault(normalised, name)
+            grams = ngrams(normalised)
+            self.name_ngrams.append(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+        for alias, name in (aliases or {}).items():
+            if name in self.coordinates:
+                self.by_normalised_name.setdefault(normalise_location_name(alias), name)
+
+    @classmethod
+    def from_records(cls, records: [dict], aliases: dict = None):
+        """
+        :param records: Rows of a locations table, with LocationName, Latitude and Longitude columns
+        :param aliases: Dictionary of other names and the known location names they stand for
+        :return: The LocationNameIndex of the locations
+        """
+        return cls(
+            {
+                row["LocationName"]: (float(row["Latitude"]), float(row["Longitude"]))
+                for row in records
+            },
+            aliases,
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.coordinates
+
+    def resolve(self, name: str) -> str:
+        """
+        :param name: Location name as written on a fixture
+        :return: The known location name it stands for, the name as written if it names a venue, or None if it can't
+        be resolved unambiguously
+        """
+        if name in self.coordinates:
+            return name
+        normalised = normalise_location_name(name)
+        resolved = self.by_normalised_name.get(normalised)
+        if resolved is not None or not normalised:
+            return resolved
+
+        # A venue name on its own stands for its pitches if there are several of them, all in the same place
+        if normalised in self.venues:
+            return name.strip()
+        return None
+
+    def suggest(self, name: str, k: int = 3) -> [str]:
+        """
+        :param name: Misspelt location name
+        :param k: Maximum number of suggestions
+        :return: Up to k known location names, most similar first
+        """
+        normalised = normalise_location_name(name)
+        grams = ngrams(normalised)
+        shared = {}
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        # Dice coefficient of the trigram sets, then the best few are re-ranked by edit similarity
+        candidates = sorted(
+            shared,
+            key=lambda i: -2 * shared[i] / (len(grams) + len(self.name_ngrams[i])),
+        )[:RERANK_CANDIDATES]
+        candidates.sort(
+            key=lambda i: -SequenceMatcher(
+                None, normalised, self.normalised_names[i]
+            ).ratio()
+        )
+        return [self.names[i] for i in candidates[:k]]
+
+
+_index_cache = {}
+
+
+def load_location_index(
+    source: str = "locations.csv", aliases: dict = None
+) -> LocationNameIndex:
+    """
+    Builds the location name index of a locations CSV file, reusing the last index built for the file until it
+    changes on disk.
+    :param source: Path of the locations CSV file
+    :param aliases: Dictionary of other names and the known location names they stand for
+    :return: The LocationNameIndex
+    """
+    key = (os.path.abspath(source), os.path.getmtime(source), repr(aliases))
+    if key not in _index_cache:
+        with open(source, mode="r", encoding="utf-8") as f:
+            index = LocationNameIndex.from_records(csv.DictReader(f), aliases)
+        _index_cache.clear()
+        _index_cache[key] = index
+    return _index_cache[key]
@@ -1,42 +1,62 @@
+import argparse
 import time
 import buzzbot
 import buzzbot_constants
 import gspread_interface
 from buzzbot_constants import buzzbotConfiguration
+from instrumentation import run_report
 
 
 def main():
     total_start_time = time.time()
+    run_report.reset()
+    buzzbotConfiguration.load()
+    buzzbot.configure_logging()
+    buzzbot.print_welcome()
 
     # Read
-    manager = gspread_interface.GoogleSheetManager(
-        credentials_file=buzzbotConfiguration.settings["google_credentials_filename"],
-        sheet_name=buzzbotConfiguration.settings["google_sheet_doc_name"],
-    )
-    matches = manager.read_sheet_as_fixtures("Fixtures List")
-    locations = manager.read_locations_sheet("Locations")
+    with run_report.span("read"):
+        manager = gspread_interface.GoogleSheetManager(
+            credentials_file=buzzbotConfiguration.settings[
+                "google_credentials_filename"
+            ],
+            sheet_name=buzzbotConfiguration.settings["google_sheet_doc_name"],
+        )
+        matches, locations = manager.read_fixtures_and_locations(
+            "Fixtures List", "Locations", teams=buzzbotConfiguration.settings["teams"]
+        )
+    run_report.increment("fixtures", len(matches))
 
     # Compute
     compute_start_time = time.time()
-    teams = buzzbotConfiguration.settings["teams"]
-    umpiring_count = {team: 0 for team in teams}
-    selection_criteria = buzzbot_constants.get_selection_criteria()
-    bot = buzzbot.BuzzBot(
-        matches,
-        teams,
-        umpiring_count,
-        criteria_=selection_criteria,
-        locations_df=locations,
-    )
-    bot.assign_covering_teams(print_results=False)
+    with run_report.span("compute"):
+        teams = buzzbotConfiguration.settings["teams"]
+        umpiring_count = {team: 0 for team in teams}
+        selection_criteria = buzzbot_constants.get_selection_criteria()
+        with run_report.span("setup"):
+            bot = buzzbot.BuzzBot(
+                matches,
+                teams,
+                umpiring_count,
+                criteria_=selection_criteria,
+                locations_df=locations,
+            )
+        bot.assign_covering_teams(print_results=False)
 
-    # Sort
-    games = bot.matches
-    games.sort(key=lambda x: x.start_time)
+        # Sort
+        games = bot.matches
+        games.sort(key=lambda x: x.start_time)
     compute_end_time = time.time()
 
     # Write
-    manager.write_assignments("Assignments", games)
+    with run_report.span("write"):
+        manager.write_assignments(
+            "Assignments",
+            games,
+            write_mode=buzzbotConfiguration.settings.get("sheets", {}).get(
+                "write_mode", "full"
+            ),
+        )
 
     total_end_time = time.time()
     total_time = total_end_time - total_start_time
@@ -44,7 +64,51 @@ def main():
     print(
         f"Total runtime: {total_time:.2f} seconds\nTotal compute time: {total_compute_time:.2f} seconds"
     )
+    report_file = buzzbotConfiguration.settings.get("instrumentation", {}).get(
+        "report_file"
+    )
+    if report_file:
+        run_report.write(report_file)
+        print(f"[+] Run report written to {report_file}")
+
+
+def watch():
+    buzzbotConfiguration.load()
+    buzzbot.configure_logging()
+    buzzbot.print_welcome()
+
+    from watcher import AssignmentWatcher
+
+    manager = gspread_interface.GoogleSheetManager(
+        credentials_file=buzzbotConfiguration.settings["google_credentials_filename"],
+        sheet_name=buzzbotConfiguration.settings["google_sheet_doc_name"],
+    )
+    watcher = AssignmentWatcher(
+        manager,
+        buzzbotConfiguration.settings["teams"],
+        write_mode=buzzbotConfiguration.settings.get("sheets", {}).get(
+            "write_mode", "full"
+        ),
+        poll_interval_seconds=buzzbotConfiguration.settings.get("watch", {}).get(
+            "poll_interval_seconds", 10
+        ),
+    )
+    try:
+        watcher.watch()
+    except KeyboardInterrupt:
+        print(f"[*] Stopped watching after {watcher.runs} run(s)")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        description="Assign covering teams to the fixtures in the Fixtures Google Sheet"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, and update the assignments whenever the fixtures or locations change",
+    )
+    if parser.parse_args().watch:
+        watch()
+    else:
+        main()
@@ -0,0 +1,56 @@
+import argparse
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["buzzbot", "main", "gspread_interface", "DistanceMatrixAPI"]
+
+
+def measure_import_time(module: str) -> (float, [(float, str)]):
+    """
+    Imports a module in a fresh interpreter with python -X importtime.
+
+    :param module: Name of the module to import
+    :return: Total import time of the module in milliseconds, and the (milliseconds, name) of every top level import
+    it pulled in, slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    total_ms, top_level, children = 0.0, [], []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        cumulative_ms = int(cumulative) / 1000
+        # Imports are listed after everything they imported, nested ones indented by two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((cumulative_ms, name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                total_ms, top_level = cumulative_ms, children
+            children = []
+    return total_ms, sorted(top_level, reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure how long it takes to import the bot's modules"
+    )
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument(
+        "--top", type=int, default=5, help="Number of slowest imports to show"
+    )
+    args = parser.parse_args()
+
+    for module in args.modules:
+        total_ms, top_level = measure_import_time(module)
+        print(f"{module}: {total_ms:.1f} ms")
+        for cumulative_ms, name in top_level[: args.top]:
+            print(f"    {name}: {cumulative_ms:.1f} ms")
@@ -1,7 +1,21 @@
 import datetime
 
+import numpy as np
+
 
 class Fixture:
+    # No per-instance __dict__, fixtures are made by the thousand
+    __slots__ = (
+        "home",
+        "away",
+        "start_time",
+        "end_time",
+        "location",
+        "covering_team",
+        "umpires_required",
+        "eligible_teams",
+    )
+
     def __init__(
         self,
         home_: str,
@@ -29,3 +43,169 @@ class Fixture:
             self.start_time < other_fixture.end_time
             and self.end_time > other_fixture.start_time
         )
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def to_epoch_minutes(moment: datetime.datetime) -> float:
+    """
+    Converts a (naive) datetime into the number of minutes since the Unix epoch
+    :param moment: datetime to convert
+    :return: Minutes since 1970-01-01 00:00 as a float
+    """
+    return (moment - EPOCH).total_seconds() / 60
+
+
+def from_epoch_minutes(minutes: float) -> datetime.datetime:
+    """
+    Converts a number of minutes since the Unix epoch back into a (naive) datetime
+    """
+    return EPOCH + datetime.timedelta(minutes=float(minutes))
+
+
+class FixtureTable:
+    """
+    Columnar store of fixtures, for when there are too many of them to keep as Fixture objects or the engine wants to
+    work on whole arrays at once. Every column is a NumPy array with an entry per fixture: teams and locations are
+    interned to integer IDs, start and end times are minutes since the epoch, and the eligible covering teams are a
+    boolean matrix with a column per uni team. The uni teams get the IDs 0 to number_of_teams - 1, in the order they
+    are given, so a team ID below number_of_teams is also a column of the eligibility matrix.
+
+    Fixture objects are only built when asked for, e.g. by the sheet writer, with fixture(i) or by iterating the
+    table.
+    """
+
+    def __init__(
+        self, fixtures: [Fixture], teams: [str] = (), location_ids: dict = None
+    ):
+        """
+        :param fixtures: List of Fixture objects
+        :param teams: The uni teams
+        :param location_ids: Dictionary of location names and the IDs indexing them in the travel time matrix. Several
+        locations on the same site share an ID. Defaults to the table's own location IDs
+        """
+        self.team_names: [str] = list(teams)
+        self.team_ids: dict = {team: i for i, team in enumerate(self.team_names)}
+        self.number_of_teams: int = len(self.team_names)
+        self.location_ids: dict = {}
+        self.location_names: [str] = []
+
+        number_of_fixtures = len(fixtures)
+        self.home_ids: np.ndarray = np.empty(number_of_fixtures, dtype=np.int32)
+        self.away_ids: np.ndarray = np.empty(number_of_fixtures, dtype=np.int32)
+        self.location_id_column: np.ndarray = np.empty(
+            number_of_fixtures, dtype=np.int32
+        )
+        self.start_minutes: np.ndarray = np.empty(number_of_fixtures)
+        self.end_minutes: np.ndarray = np.empty(number_of_fixtures)
+        self.umpires_required: np.ndarray = np.empty(number_of_fixtures, dtype=np.int8)
+        # -1 until a covering team is assigned
+        self.covering_team_ids: np.ndarray = np.full(
+            number_of_fixtures, -1, dtype=np.int32
+        )
+        self.eligibility: np.ndarray = np.zeros(
+            (number_of_fixtures, self.number_of_teams), dtype=bool
+        )
+
+        for i, fixture in enumerate(fixtures):
+            self.home_ids[i] = self.intern_team(fixture.home)
+            self.away_ids[i] = self.intern_team(fixture.away)
+            self.location_id_column[i] = self.intern_location(fixture.location)
+            self.start_minutes[i] = to_epoch_minutes(fixture.start_time)
+            self.end_minutes[i] = to_epoch_minutes(fixture.end_time)
+            self.umpires_required[i] = fixture.umpires_required
+            if fixture.covering_team:
+                self.covering_team_ids[i] = self.intern_team(fixture.covering_team)
+            for team in fixture.eligible_teams:
+                if team in self.team_ids and self.team_ids[team] < self.number_of_teams:
+                    self.eligibility[i, self.team_ids[team]] = True
+
+        # Travel time matrix index of each of the table's location IDs
+        self.location_matrix_ids: np.ndarray = np.array(
+            [
+                location_ids[name] if location_ids is not None else i
+                for i, name in enumerate(self.location_names)
+            ],
+            dtype=np.int32,
+        )
+
+    def __len__(self) -> int:
+        return len(self.start_minutes)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.fixture(i)
+
+    def intern_team(self, name: str) -> int:
+        team_id = self.team_ids.get(name)
+        if team_id is None:
+            team_id = self.team_ids[name] = len(self.team_names)
+            self.team_names.append(name)
+        return team_id
+
+    def intern_location(self, name: str) -> int:
+        location_id = self.location_ids.get(name)
+        if location_id is None:
+            location_id = self.location_ids[name] = len(self.location_names)
+            self.location_names.append(name)
+        return location_id
+
+    def fixture(self, i: int) -> Fixture:
+        """
+        Builds the Fixture object of a row of the table
+        :param i: Row of the table
+        :return: The Fixture, with its covering team and eligible covering teams
+        """
+        fixture = Fixture(
+            self.team_names[self.home_ids[i]],
+            self.team_names[self.away_ids[i]],
+            from_epoch_minutes(self.start_minutes[i]),
+            int(self.umpires_required[i]),
+            self.location_names[self.location_id_column[i]],
+        )
+        if self.covering_team_ids[i] >= 0:
+            fixture.covering_team = self.team_names[self.covering_team_ids[i]]
+        fixture.eligible_teams = sorted(
+            self.team_names[team_id] for team_id in np.flatnonzero(self.eligibility[i])
+        )
+        return fixture
+
+    def to_fixtures(self) -> [Fixture]:
+        return list(self)
+
+    def rows_by_date(self) -> dict:
+        """
+        Groups the rows of the table by the date their fixtures are played on
+        :return: Dictionary where key is the date, and the values are arrays of rows in start time order
+        """
+        order = np.argsort(self.start_minutes, kind="stable")
+        days = (self.start_minutes[order] // (24 * 60)).astype(np.int64)
+        boundaries = np.flatnonzero(np.diff(days)) + 1
+        return {
+            (EPOCH + datetime.timedelta(days=int(row_days[0]))).date(): rows
+            for rows, row_days in zip(
+                np.split(order, boundaries), np.split(days, boundaries)
+            )
+            if len(rows)
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the columns of the table, in bytes
+        """
+        return sum(
+            column.nbytes
+            for column in (
+                self.home_ids,
+                self.away_ids,
+                self.location_id_column,
+                self.start_minutes,
+                self.end_minutes,
+                self.umpires_required,
+                self.covering_team_ids,
+                self.eligibility,
+                self.location_matrix_ids,
+            )
+        )
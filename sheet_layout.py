@@ -0,0 +1,106 @@
+from models import Fixture
+
+HEADERS = ["Day", "Date"]
+COVER_ROW_LABEL = "Buzzbot cover recommendation"
+ELIGIBLE_ROW_LABEL = "All eligible covering teams"
+BLANK_ROWS_BETWEEN_DAYS = 2
+
+
+def build_assignments_grid(fixtures: [Fixture]) -> [[str]]:
+    """
+    Lays out fixture assignments in the traditional 'fixtures umpiring combo doc' style, as the 2-D list of cell values
+    to write to the Assignments worksheet. There is a column per uni team, and every match day gets a block of rows:
+    the fixtures, the recommended covering teams, all the eligible covering teams, then two blank rows.
+
+    Each block is appended when its match day starts and filled in as its fixtures come in, so the grid is built in a
+    single pass over the fixtures.
+
+    :param fixtures: List of Fixture objects with covering_team assignments, sorted by start time
+    :return: List of rows, each a list of strings, starting with the header row
+    """
+    teams = sorted({fixture.home for fixture in fixtures})
+    columns = {team: i for i, team in enumerate(teams, start=len(HEADERS))}
+    width = len(HEADERS) + len(teams)
+
+    grid = [HEADERS + teams]
+    current_date = None
+    for fixture in fixtures:
+        if fixture.start_time.date() != current_date:
+            current_date = fixture.start_time.date()
+            fixture_row = [""] * width
+            fixture_row[0] = fixture.start_time.strftime("%A")
+            fixture_row[1] = fixture.start_time.strftime("%d/%m/%Y")
+            cover_row = [""] * width
+            cover_row[1] = COVER_ROW_LABEL
+            eligible_row = [""] * width
+            eligible_row[1] = ELIGIBLE_ROW_LABEL
+            grid.extend([fixture_row, cover_row, eligible_row])
+            grid.extend([""] * width for _ in range(BLANK_ROWS_BETWEEN_DAYS))
+
+        column = columns[fixture.home]
+        fixture_row[column] = (
+            f"{fixture.away} {fixture.start_time.strftime('%H:%M')} PB @ {fixture.location}"
+        )
+        cover_row[column] = (
+            f"{fixture.covering_team} cover\n({fixture.umpires_required}x required)"
+        )
+        eligible_row[column] = ", ".join(fixture.eligible_teams)
+    return grid
+
+
+def column_letter(column: int) -> str:
+    """
+    :param column: 1-based column number
+    :return: The A1 notation letters of the column, e.g. 1 -> A, 27 -> AA
+    """
+    letters = ""
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def cell_range(row: int, first_column: int, last_column: int) -> str:
+    """
+    :return: The A1 notation of the cells first_column to last_column (1-based, inclusive) of a row
+    """
+    start = f"{column_letter(first_column)}{row}"
+    if last_column == first_column:
+        return start
+    return f"{start}:{column_letter(last_column)}{row}"
+
+
+def diff_grids(current: [[str]], grid: [[str]]) -> [dict]:
+    """
+    Compares the cells a worksheet holds now with the grid that is about to be written to it, and returns only the
+    changed cells, with every run of adjacent changed cells in a row merged into one range. Cells outside the grid are
+    left alone, exactly as when the whole grid is written.
+
+    :param current: Cell values currently in the worksheet, starting at A1. Rows may be ragged or missing.
+    :param grid: Cell values to write, starting at A1
+    :return: List of {"range": ..., "values": ...} updates in the format taken by Worksheet.batch_update
+    """
+    updates = []
+    for row_number, row in enumerate(grid, start=1):
+        current_row = current[row_number - 1] if row_number <= len(current) else []
+        run_start = None
+        for column, value in enumerate(row):
+            current_value = current_row[column] if column < len(current_row) else ""
+            changed = value != current_value
+            if changed and run_start is None:
+                run_start = column
+            elif not changed and run_start is not None:
+                updates.append(
+                    _row_update(row_number, run_start, row[run_start:column])
+                )
+                run_start = None
+        if run_start is not None:
+            updates.append(_row_update(row_number, run_start, row[run_start:]))
+    return updates
+
+
+def _row_update(row_number: int, first_column: int, values: [str]) -> dict:
+    return {
+        "range": cell_range(row_number, first_column + 1, first_column + len(values)),
+        "values": [values],
+    }
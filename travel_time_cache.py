@@ -0,0 +1,215 @@
+import json
+import os
+import sqlite3
+import tempfile
+from abc import ABC, abstractmethod
+
+LEGACY_CACHE_FILE = "distance_matrix_cache.json"
+DEFAULT_CACHE_FILES = {
+    "json": "distance_matrix_cache.json",
+    "log": "distance_matrix_cache.jsonl",
+    "sqlite": "distance_matrix_cache.sqlite3",
+}
+
+
+class TravelTimeCache(ABC):
+    """
+    Persistent store of travel times in seconds, keyed by "origin_destination" coordinate strings. New entries are
+    buffered by add() and only written to disk, in one go, by commit() at the end of a fetch batch.
+    """
+
+    def __init__(self):
+        self.pending: dict = {}
+
+    def add(self, key: str, travel_time: int) -> None:
+        self.pending[key] = travel_time
+
+    def get(self, key: str) -> int:
+        """
+        :param key: "origin_destination" coordinate string
+        :return: The cached travel time in seconds, or None if it isn't cached
+        """
+        if key in self.pending:
+            return self.pending[key]
+        return self.lookup(key)
+
+    def commit(self) -> None:
+        if self.pending:
+            self.write(self.pending)
+            self.pending = {}
+
+    def close(self) -> None:
+        self.commit()
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self.size() + sum(1 for k in self.pending if self.lookup(k) is None)
+
+    @abstractmethod
+    def lookup(self, key: str) -> int:
+        pass
+
+    @abstractmethod
+    def write(self, entries: dict) -> None:
+        pass
+
+    @abstractmethod
+    def size(self) -> int:
+        pass
+
+
+class MemoryTravelTimeCache(TravelTimeCache):
+    """
+    Cache that is never written to disk, for benchmarks and dry runs.
+    """
+
+    def __init__(self, entries: dict = None):
+        super().__init__()
+        self.entries: dict = dict(entries or {})
+
+    def lookup(self, key: str) -> int:
+        return self.entries.get(key)
+
+    def write(self, entries: dict) -> None:
+        self.entries.update(entries)
+
+    def size(self) -> int:
+        return len(self.entries)
+
+
+class JsonTravelTimeCache(MemoryTravelTimeCache):
+    """
+    The original single JSON file cache. The whole file is loaded on open and rewritten on commit, atomically, by
+    writing to a temporary file and renaming it over the old one.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        super().__init__(read_json_cache(path))
+
+    def write(self, entries: dict) -> None:
+        super().write(entries)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(self.entries, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f.name, self.path)
+
+
+class AppendOnlyTravelTimeCache(MemoryTravelTimeCache):
+    """
+    Cache stored as a log of one JSON object per line. Commits only append the new entries, so filling the cache costs
+    disk I/O proportional to what was fetched, and a crash can at worst leave a torn last line, which is skipped when
+    the log is read back.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        super().__init__()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry, dict):
+                        self.entries.update(entry)
+
+    def write(self, entries: dict) -> None:
+        super().write(entries)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for key, travel_time in entries.items():
+                f.write(json.dumps({key: travel_time}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class SqliteTravelTimeCache(TravelTimeCache):
+    """
+    Cache stored in an SQLite database. Opening it reads nothing up front, lookups go to the database on demand, and
+    every commit is a single transaction.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path: str = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS travel_times (key TEXT PRIMARY KEY, seconds INTEGER NOT NULL)"
+        )
+        self.connection.commit()
+
+    def lookup(self, key: str) -> int:
+        row = self.connection.execute(
+            "SELECT seconds FROM travel_times WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def write(self, entries: dict) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO travel_times (key, seconds) VALUES (?, ?)",
+                entries.items(),
+            )
+
+    def size(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM travel_times").fetchone()[
+            0
+        ]
+
+    def close(self) -> None:
+        super().close()
+        self.connection.close()
+
+
+def read_json_cache(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        # Failed lookups used to be cached as null, they must be fetched again.
+        return {k: v for k, v in json.load(f).items() if v is not None}
+
+
+def open_travel_time_cache(backend: str = "json", path: str = None) -> TravelTimeCache:
+    """
+    Opens the travel time cache for the given backend. A new log or SQLite cache is seeded from the legacy JSON cache
+    file if there is one, so switching backends doesn't throw away the API calls already paid for.
+
+    :param backend: One of 'json', 'log', 'sqlite' or 'memory'
+    :param path: Location of the cache file, defaults to a file per backend in the working directory
+    :return: The opened cache
+    """
+    if backend == "memory":
+        return MemoryTravelTimeCache()
+    if backend not in DEFAULT_CACHE_FILES:
+        raise ValueError(
+            f"Unknown travel time cache backend '{backend}'. Expected one of "
+            f"{list(DEFAULT_CACHE_FILES) + ['memory']}."
+        )
+
+    path = path or DEFAULT_CACHE_FILES[backend]
+    if backend == "json":
+        return JsonTravelTimeCache(path)
+
+    is_new = not os.path.exists(path)
+    cache = (
+        AppendOnlyTravelTimeCache(path)
+        if backend == "log"
+        else SqliteTravelTimeCache(path)
+    )
+    if is_new and os.path.abspath(path) != os.path.abspath(LEGACY_CACHE_FILE):
+        legacy_entries = read_json_cache(LEGACY_CACHE_FILE)
+        if legacy_entries:
+            print(
+                f"[+] Importing {len(legacy_entries)} travel times from {LEGACY_CACHE_FILE} into {path}"
+            )
+            for key, travel_time in legacy_entries.items():
+                cache.add(key, travel_time)
+            cache.commit()
+    return cache
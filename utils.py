@@ -4,11 +4,10 @@ import math
 import random
 import subprocess
 from datetime import datetime, timedelta
-from difflib import SequenceMatcher
 
 from buzzbot_constants import buzzbotConfiguration
-
-import DistanceMatrixAPI
+from fixture_loader import FixtureLoader
+from location_index import load_location_index
 
 
 class ExceptionWithList(Exception):
@@ -39,11 +38,8 @@ for EUMHC together at the same time. Then times that by 10 million.`
     print(ascii_art)
 
 
-taglines = buzzbotConfiguration.settings['taglines']
-
-
 def get_opening_tagline():
-    return random.choice(taglines)
+    return random.choice(buzzbotConfiguration.settings['taglines'])
 
 
 def get_opening_tagline_with_cowsay():
@@ -62,92 +58,36 @@ def print_warning(message):
     print(warning)
 
 
-def compute_closest_location_string(target: str, locations: [str]) -> str:
-    best_match = None
-    highest_similarity = 0.0
-    for s in locations:
-        similarity = SequenceMatcher(None, target, s).ratio()
-        if similarity > highest_similarity:
-            highest_similarity = similarity
-            best_match = s
-    return best_match
+def get_location_index():
+    aliases = buzzbotConfiguration.settings.get('locations', {}).get('aliases')
+    return load_location_index('locations.csv', aliases)
 
 
 def validate_csv_format(file_path):
-    lm = DistanceMatrixAPI.LocationManager()
-    correct_locations = lm.get_all_location_names()
-    errors = []
-    errors_exist = False
-    teams = buzzbotConfiguration.settings['teams']
-    expected_headers = ['uni_team', 'opposition', 'start_time', 'umpires_needed', 'location']  # Example headers
-    expected_num_columns = len(expected_headers)
-    with open(file_path, mode='r', encoding='utf-8') as csvfile:
-        reader = csv.reader(csvfile)
-
-        headers = next(reader)
-        if headers != expected_headers:
-            errors_exist = True
-            errors.append(f"Your column names in your input file are incorrect. The program got {headers} from you "
-                          f"but expect {expected_headers}. Please go into the file and change the column names.")
-
-        for row_number, row in enumerate(reader, start=2):  # Starting from 2 because header is row 1
-            if len(row) != expected_num_columns:
-                errors_exist = True
-                errors.append(
-                    f"Row {row_number} - {row} - has incorrect number of columns. Got {len(row)} columns from "
-                    f"you in that row but expected {expected_num_columns}")
-
-            if row[0] not in teams:
-                errors_exist = True
-                errors.append(f"Row {row_number} - {row} - the first column which is meant to represent the uni team "
-                              f"is not an actual uni team ({row[0]}). It should be 1s, 2s, 3s, 4s, 5s, 6s, or 7s")
-
-            try:
-                datetime.strptime(row[2], '%Y-%m-%d %H:%M:%S')
-            except Exception as e:
-                errors_exist = True
-                errors.append(
-                    f"Row {row_number} - {row} - start_time value is not of the correct format. It is {row[2]} and it "
-                    f"should be of the format 'YYYY-MM-DD HH:MM:SS'")
-
-            if not row[3].isdigit():
-                errors_exist = True
-                errors.append(
-                    f"Row {row_number} - {row} - the umpires_needed value is not a number. It is instead {row[3]}")
-
-            if int(row[3]) < 0 or int(row[3]) > 2:
-                errors_exist = True
-                errors.append(f"Row {row_number} - {row} - has an invalid number of umpires. It should either be 0, 1, "
-                              f"or 2. It is currently {row[3]}")
-
-            if row[4] not in correct_locations:
-                errors_exist = True
-                errors.append(
-                    f"Row {row_number} - {row} - has an invalid match location. Have you spelt the name '{row[4]}'"
-                    f" correctly? Did you possibly mean '{compute_closest_location_string(row[4], correct_locations)}' "
-                    f"instead? Please refer to the location table for the correct location names.")
-
-    return errors_exist, errors
-
-
-def generate_unique_match_times(base_date, num_matches):
+    loader = FixtureLoader(buzzbotConfiguration.settings['teams'], get_location_index())
+    for _ in loader.iter_csv(file_path):
+        pass
+    return bool(loader.errors), loader.errors
+
+
+def generate_unique_match_times(base_date, num_matches, rng=random):
     generated_times = set()
     while len(generated_times) < num_matches:
-        random_hour = random.normalvariate(14, 2)  # Mean at 14 (2 PM), with some standard deviation
+        random_hour = rng.normalvariate(14, 2)  # Mean at 14 (2 PM), with some standard deviation
         random_hour = max(11.5, min(random_hour, 20))  # Ensure time is within bounds
         hour = int(random_hour)
-        minute = 30 if random.randint(0, 1) == 1 else 0  # Randomly choose between :00 and :30
+        minute = 30 if rng.randint(0, 1) == 1 else 0  # Randomly choose between :00 and :30
         match_time = base_date.replace(hour=hour, minute=minute, second=0)
         generated_times.add(match_time)
 
     return sorted(list(generated_times))
 
 
-def choose_location(locations):
-    # 50% chance for "Peffermill", 50% for any other location
+def choose_location(locations, home="Peffermill", rng=random):
+    # 50% chance for the home venue ("Peffermill"), 50% for any other location
     return \
-        random.choices(["Peffermill", random.choice([loc for loc in locations if loc != "Peffermill"])], weights=[1, 1],
-                       k=1)[0]
+        rng.choices([home, rng.choice([loc for loc in locations if loc != home])], weights=[1, 1],
+                    k=1)[0]
 
 
 def generate_csv(filename, num_days):
@@ -187,6 +127,42 @@ def generate_csv(filename, num_days):
                 })
 
 
+def generate_fixture_records(num_fixtures, teams, locations, seed=None, start_date=datetime(2024, 9, 7)):
+    """
+    Generates a random season of fixtures, the same way generate_csv does, but of any size and for any number of teams
+    and venues. Match days are consecutive days from start_date, each with up to one game per team.
+    :param num_fixtures: Number of fixtures in the season
+    :param teams: Names of the uni teams
+    :param locations: Names of the venues, the first one is treated as the home venue
+    :param seed: Seed for the random number generator, for reproducible seasons
+    :param start_date: Date of the first match day
+    :return: List of rows as they are read from the Fixtures List worksheet
+    """
+    rng = random.Random(seed)
+    opposition_names = ["Wildcats", "Clydesdale 2s", "Grange 3s", "Uddingston 2s", "Stirling Wanderers",
+                        "Reivers", "Peebles", "St Andrews 1s", "Heriot Watt 1s", "Napier 1s", "Abertay", "Dundee 2s"]
+    # generate_unique_match_times only has twenty kick off slots to choose from
+    max_matches_per_day = min(len(teams), 12)
+    records = []
+    day_date = start_date
+    while len(records) < num_fixtures:
+        num_matches = min(rng.randint(max(1, max_matches_per_day // 2), max_matches_per_day),
+                          num_fixtures - len(records))
+        match_times = generate_unique_match_times(day_date, num_matches, rng=rng)
+        for team, match_time in zip(rng.sample(teams, num_matches), match_times):
+            records.append({
+                'uni_team': team,
+                'opposition': rng.choice(opposition_names),
+                'date': match_time.strftime('%d/%m/%Y'),
+                'pushback_time': match_time.strftime('%H:%M'),
+                'umpires_needed': rng.choices([0, 1, 2], weights=[10, 85, 5], k=1)[0] if team != teams[0] else 0,
+                'location': choose_location(locations, home=locations[0], rng=rng) if len(locations) > 1
+                else locations[0]
+            })
+        day_date += timedelta(days=1)
+    return records
+
+
 def calculate_confidence(I: timedelta, T: timedelta) -> float:
     """
     Logistic function chosen with small value at 0 and a large value at 60
@@ -0,0 +1,155 @@
+import time
+
+import pandas as pd
+
+import buzzbot
+import buzzbot_constants
+from assignment_state import fingerprint
+from buzzbot_constants import buzzbotConfiguration
+from gspread_interface import GoogleSheetManager
+from instrumentation import run_report
+from location_index import LocationNameIndex
+from utils import ExceptionWithList
+
+
+class AssignmentWatcher:
+    """
+    Keeps BuzzBot running and re-runs the assignments whenever the fixtures or locations worksheets change. Everything
+    that costs time to set up is kept between runs: the authorised Sheets client and spreadsheet, the location name
+    index and locations table (rebuilt only when the locations worksheet changes), and the Distance Matrix API
+    interface with its in-memory travel time cache and HTTP session.
+
+    Each poll asks Drive for the spreadsheet's version, which is a single small request. Only when the version has
+    changed are the fixtures and locations worksheets read, and the assignments are only re-run if what was read
+    differs from the last run. Edits to any other worksheet, including the assignments written by the last run, change
+    the version but not the inputs, so they cost one read and nothing more.
+    """
+
+    def __init__(
+        self,
+        manager: GoogleSheetManager,
+        teams: [str],
+        fixtures_worksheet: str = "Fixtures List",
+        locations_worksheet: str = "Locations",
+        assignments_worksheet: str = "Assignments",
+        write_mode: str = "full",
+        poll_interval_seconds: float = 10,
+    ):
+        """
+        :param manager: GoogleSheetManager of the fixtures spreadsheet, kept open between runs
+        :param teams: The uni teams
+        :param fixtures_worksheet: Name of the fixtures worksheet
+        :param locations_worksheet: Name of the locations worksheet
+        :param assignments_worksheet: Name of the worksheet the assignments are written to
+        :param write_mode: How the assignments are written, see GoogleSheetManager.write_assignments
+        :param poll_interval_seconds: Seconds between checks for changes
+        """
+        self.manager: GoogleSheetManager = manager
+        self.teams: [str] = teams
+        self.fixtures_worksheet: str = fixtures_worksheet
+        self.locations_worksheet: str = locations_worksheet
+        self.assignments_worksheet: str = assignments_worksheet
+        self.write_mode: str = write_mode
+        self.poll_interval_seconds: float = poll_interval_seconds
+        self.revision: str = None
+        self.inputs_fingerprint: str = None
+        self.locations_fingerprint: str = None
+        self.location_index: LocationNameIndex = None
+        self.locations_df: pd.DataFrame = None
+        self.api = None
+        self.runs: int = 0
+
+    def poll(self) -> bool:
+        """
+        Checks the spreadsheet for changes, and re-runs the assignments if the fixtures or locations have changed
+        :return: True if the assignments were re-run
+        """
+        revision = self.manager.get_revision()
+        if revision == self.revision:
+            return False
+        self.revision = revision
+
+        records = self.manager.read_records_batch(
+            [self.fixtures_worksheet, self.locations_worksheet]
+        )
+        inputs_fingerprint = fingerprint(
+            records[self.fixtures_worksheet], records[self.locations_worksheet]
+        )
+        if inputs_fingerprint == self.inputs_fingerprint:
+            return False
+        self.run(records)
+        self.inputs_fingerprint = inputs_fingerprint
+        return True
+
+    def run(self, records: dict) -> None:
+        """
+        Assigns covering teams to the fixtures read and writes them to the assignments worksheet
+        :param records: The rows of the fixtures and locations worksheets, keyed by worksheet name
+        """
+        run_start_time = time.time()
+        run_report.reset()
+
+        locations_fingerprint = fingerprint(records[self.locations_worksheet])
+        if locations_fingerprint != self.locations_fingerprint:
+            self.location_index = LocationNameIndex.from_records(
+                records[self.locations_worksheet],
+                buzzbotConfiguration.settings.get("locations", {}).get("aliases"),
+            )
+            self.locations_df = pd.DataFrame(records[self.locations_worksheet])
+            self.locations_fingerprint = locations_fingerprint
+
+        with run_report.span("compute"):
+            matches = GoogleSheetManager.fixtures_from_records(
+                records[self.fixtures_worksheet], self.teams, self.location_index
+            )
+            run_report.increment("fixtures", len(matches))
+            bot = buzzbot.BuzzBot(
+                matches,
+                self.teams,
+                {team: 0 for team in self.teams},
+                criteria_=buzzbot_constants.get_selection_criteria(),
+                locations_df=self.locations_df,
+                api_=self.api,
+            )
+            self.api = bot.api
+            bot.assign_covering_teams(print_results=False)
+            games = bot.matches
+            games.sort(key=lambda x: x.start_time)
+
+        with run_report.span("write"):
+            self.manager.write_assignments(
+                self.assignments_worksheet, games, write_mode=self.write_mode
+            )
+
+        self.runs += 1
+        print(
+            f"[+] Assignments updated for {len(games)} fixtures in {time.time() - run_start_time:.2f} seconds"
+        )
+        report_file = buzzbotConfiguration.settings.get("instrumentation", {}).get(
+            "report_file"
+        )
+        if report_file:
+            run_report.write(report_file)
+
+    def watch(self) -> None:
+        """
+        Polls the spreadsheet until interrupted with Ctrl+C. Invalid fixtures are reported and then waited on until the
+        spreadsheet changes again. Any other failure, e.g. a dropped connection, is retried on the next poll.
+        """
+        print(
+            f"[*] Watching '{self.fixtures_worksheet}' and '{self.locations_worksheet}' for changes every "
+            f"{self.poll_interval_seconds} seconds. Press Ctrl+C to stop."
+        )
+        while True:
+            try:
+                self.poll()
+            except ExceptionWithList as e:
+                print("[-] The fixtures could not be read:")
+                for error in e.messages:
+                    print(f"    {error}")
+            except Exception as e:
+                print(
+                    f"[-] ERROR: {e}. Trying again in {self.poll_interval_seconds} seconds."
+                )
+                self.revision = None
+            time.sleep(self.poll_interval_seconds)